@@ -1,11 +1,30 @@
 import sqlite3
+import contextlib
 import csv
+import json
 import re
 import os
 import time
+from operator import itemgetter
 
 DB_FILE = "databook.db"
 
+@contextlib.contextmanager
+def bulk_load_pragmas(conn):
+    # No journal file or fsyncs while loading; the build always starts from a
+    # fresh file, so a crash mid-load just means rerunning it
+    journal_mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+    synchronous = conn.execute("PRAGMA synchronous").fetchone()[0]
+    temp_store = conn.execute("PRAGMA temp_store").fetchone()[0]
+    conn.executescript("PRAGMA journal_mode=MEMORY; PRAGMA synchronous=OFF; PRAGMA temp_store=MEMORY;")
+    try:
+        yield conn
+    finally:
+        conn.commit()
+        conn.execute(f"PRAGMA journal_mode={journal_mode}")
+        conn.execute(f"PRAGMA synchronous={synchronous}")
+        conn.execute(f"PRAGMA temp_store={temp_store}")
+
 def init_db(conn):
     cursor = conn.cursor()
     
@@ -47,7 +66,8 @@ def init_db(conn):
         due_date TEXT,
         main_commodity TEXT,
         procurement_method TEXT,
-        normalized_epin TEXT
+        normalized_epin TEXT,
+        release_year INTEGER
     )
     """)
     
@@ -71,7 +91,8 @@ def init_db(conn):
         end_date TEXT,
         industry TEXT,
         normalized_contract_id TEXT,
-        normalized_epin TEXT
+        normalized_epin TEXT,
+        start_year INTEGER
     )
     """)
     
@@ -243,27 +264,43 @@ def init_db(conn):
         EventStateCode TEXT,
         EventZipCode TEXT,
         wegov_org_name TEXT,
-        wegov_org_id TEXT
+        wegov_org_id TEXT,
+        normalized_pin TEXT
     )
     """)
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_crol_pin ON crol(PIN)")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_crol_agency ON crol(AgencyName)")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_crol_vendor ON crol(VendorName)")
     
     conn.commit()
 
+# Every ASCII byte except A-Z and 0-9, for bytes.translate deletion
+_NON_ALNUM_BYTES = bytes(b for b in range(128) if not (chr(b).isdigit() or chr(b).isupper()))
+
+def alnum_upper(text):
+    # Uppercase and keep only A-Z0-9; same result as re.sub(r'[^A-Z0-9]', '', text.upper())
+    # but a single C-level pass instead of a regex
+    return text.upper().encode('ascii', 'ignore').translate(None, _NON_ALNUM_BYTES).decode('ascii')
+
+# Patterns used per row by the loaders, compiled once
+_YEAR_RE = re.compile(r'\s*(?:\d{1,2}/\d{1,2}/)?(\d{4})')
+_MONEY_RE = re.compile(r'[^0-9.]')
+
 def normalize_contract_id(cid):
     if not cid: return None
     # Remove hyphens, spaces, and make uppercase
-    return re.sub(r'[^A-Z0-9]', '', cid.upper())
+    return alnum_upper(cid)
 
 def normalize_epin(epin):
     if not epin: return None
-    return re.sub(r'[^A-Z0-9]', '', epin.upper())
+    return alnum_upper(epin)
+
+def extract_year(date_str):
+    # Dates come as MM/DD/YYYY (optionally with a time) or YYYY-MM-DD
+    if not date_str: return None
+    match = _YEAR_RE.match(date_str)
+    return int(match.group(1)) if match else None
 
 def clean_money(val):
     if not val: return 0.0
-    cleaned = re.sub(r'[^0-9.]', '', val)
+    cleaned = _MONEY_RE.sub('', val)
     if not cleaned: return 0.0
     try:
         return float(cleaned)
@@ -273,24 +310,44 @@ def clean_money(val):
 def clean_name(name):
     if not name: return ""
     # Uppercase, remove special chars, extra spaces
-    return re.sub(r'[^A-Z0-9]', '', name.upper())
+    return alnum_upper(name)
+
+def csv_rows(f, *columns):
+    """
+    Yield a tuple of the named columns for each CSV row.
+    
+    Reads the header once and indexes plain csv.reader lists instead of
+    building a dict per row; behaves like csv.DictReader + row.get(), i.e.
+    blank lines are skipped and missing columns/fields come back as None.
+    """
+    reader = csv.reader(f)
+    header = next(reader, [])
+    index = {name: i for i, name in enumerate(header)}
+    width = len(header)
+    # Absent columns point at a trailing None slot appended to every row
+    get = itemgetter(*[index.get(col, width) for col in columns])
+    pad = [None] * (width + 1)
+    for row in reader:
+        if len(row) != width:
+            if not row:
+                continue
+            row = (row + pad)[:width]
+        row.append(None)
+        yield get(row)
 
 def load_vendors(conn):
     print("Loading Vendors...")
     with open("vendor_data.csv", 'r', encoding='utf-8-sig') as f:
-        reader = csv.DictReader(f)
-        to_db = []
-        for row in reader:
-            to_db.append((
-                row.get("PASSPort Supplier-ID"),
-                row.get("Vendor Name"),
-                row.get("FMS Vendor Code"),
-                row.get("DUNS Number"),
-                row.get("Certification Type"),
-                row.get("Ethnicity"),
-                row.get("Business Category"),
-                row.get("Corporate Structure")
-            ))
+        to_db = list(csv_rows(f,
+            "PASSPort Supplier-ID",
+            "Vendor Name",
+            "FMS Vendor Code",
+            "DUNS Number",
+            "Certification Type",
+            "Ethnicity",
+            "Business Category",
+            "Corporate Structure"
+        ))
         
         cursor = conn.cursor()
         cursor.executemany("""
@@ -301,108 +358,119 @@ def load_vendors(conn):
         conn.commit()
     print(f"Loaded {len(to_db)} vendors.")
 
+def solicitation_rows(f, agencies=None):
+    """
+    Yield solicitations table rows (in column order) from the solicitations CSV.
+    
+    If `agencies` is given, each agency's first-seen name is recorded in it by id.
+    """
+    for row in csv_rows(f,
+        "RFP-ID",
+        "BPM-ID",
+        "Program",
+        "Industry",
+        "EPIN",
+        "Procurement Name",
+        "Agency",
+        "wegov-org-id",
+        "RFx Status",
+        "Release Date",
+        "Due Date",
+        "Main Commodity",
+        "Procurement Method"
+    ):
+        epin, agency_name, agency_id, release_date = row[4], row[6], row[7], row[9]
+        
+        if agencies is not None and agency_id and agency_name:
+            agencies.setdefault(agency_id, agency_name)
+        
+        yield row + (normalize_epin(epin), extract_year(release_date))
+
+def contract_rows(f, agencies=None):
+    """
+    Yield contracts table rows (in column order) from the contracts CSV.
+    
+    If `agencies` is given, each agency's first-seen name is recorded in it by id.
+    """
+    for row in csv_rows(f,
+        "CTR-ID",
+        "EPIN",
+        "Contract ID",
+        "Contract Title",
+        "Agency",
+        "wegov-org-id",
+        "Vendor",
+        "Program",
+        "Procurement Method",
+        "Contract Type",
+        "Status",
+        "Award Amount",
+        "Current Contract Amount",
+        "Contract Start Date",
+        "Contract End Date",
+        "Industry"
+    ):
+        epin, cid, agency_name, agency_id, start_date = row[1], row[2], row[4], row[5], row[13]
+        
+        if agencies is not None and agency_id and agency_name:
+            agencies.setdefault(agency_id, agency_name)
+        
+        yield (
+            row[:11]
+            + (clean_money(row[11]), clean_money(row[12]))
+            + row[13:]
+            + (normalize_contract_id(cid), normalize_epin(epin), extract_year(start_date))
+        )
+
 def load_solicitations(conn):
     print("Loading Solicitations...")
     with open("solicitations_data.csv", 'r', encoding='utf-8-sig') as f:
-        reader = csv.DictReader(f)
-        to_db = []
-        for row in reader:
-            epin = row.get("EPIN")
-            agency_id = row.get("wegov-org-id")
-            agency_name = row.get("Agency")
-            
-            # Populate Agencies on the fly
-            if agency_id and agency_name:
-                cursor = conn.cursor()
-                cursor.execute("INSERT OR IGNORE INTO agencies (id, name) VALUES (?, ?)", (agency_id, agency_name))
-            
-            to_db.append((
-                row.get("RFP-ID"),
-                row.get("BPM-ID"),
-                row.get("Program"),
-                row.get("Industry"),
-                epin,
-                row.get("Procurement Name"),
-                agency_name,
-                agency_id,
-                row.get("RFx Status"),
-                row.get("Release Date"),
-                row.get("Due Date"),
-                row.get("Main Commodity"),
-                row.get("Procurement Method"),
-                normalize_epin(epin)
-            ))
-            
+        # Populate Agencies on the fly (first name seen wins)
+        agencies = {}
+        
+        # Stream rows straight into executemany rather than building a list
         cursor = conn.cursor()
         cursor.executemany("""
         INSERT OR IGNORE INTO solicitations
-        (rfp_id, bpm_id, program, industry, epin, procurement_name, agency, agency_id, rfx_status, release_date, due_date, main_commodity, procurement_method, normalized_epin)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, to_db)
+        (rfp_id, bpm_id, program, industry, epin, procurement_name, agency, agency_id, rfx_status, release_date, due_date, main_commodity, procurement_method, normalized_epin, release_year)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, solicitation_rows(f, agencies))
+        loaded = cursor.rowcount
+        cursor.executemany("INSERT OR IGNORE INTO agencies (id, name) VALUES (?, ?)", agencies.items())
         conn.commit()
-    print(f"Loaded {len(to_db)} solicitations.")
+    print(f"Loaded {loaded} solicitations.")
 
 def load_contracts(conn):
     print("Loading Contracts...")
     with open("contracts_data.csv", 'r', encoding='utf-8-sig') as f:
-        reader = csv.DictReader(f)
-        to_db = []
-        for row in reader:
-            cid = row.get("Contract ID")
-            epin = row.get("EPIN")
-            agency_id = row.get("wegov-org-id")
-            agency_name = row.get("Agency")
-            
-            # Populate Agencies on the fly
-            if agency_id and agency_name:
-                cursor = conn.cursor()
-                cursor.execute("INSERT OR IGNORE INTO agencies (id, name) VALUES (?, ?)", (agency_id, agency_name))
-            
-            to_db.append((
-                row.get("CTR-ID"),
-                epin,
-                cid,
-                row.get("Contract Title"),
-                agency_name,
-                agency_id,
-                row.get("Vendor"),
-                row.get("Program"),
-                row.get("Procurement Method"),
-                row.get("Contract Type"),
-                row.get("Status"),
-                clean_money(row.get("Award Amount")),
-                clean_money(row.get("Current Contract Amount")),
-                row.get("Contract Start Date"),
-                row.get("Contract End Date"),
-                row.get("Industry"),
-                normalize_contract_id(cid),
-                normalize_epin(epin)
-            ))
-            
+        # Populate Agencies on the fly (first name seen wins)
+        agencies = {}
+        
+        # Stream rows straight into executemany rather than building a list
         cursor = conn.cursor()
         cursor.executemany("""
         INSERT OR IGNORE INTO contracts
-        (ctr_id, epin, contract_id, contract_title, agency, agency_id, vendor_name, program, procurement_method, contract_type, status, award_amount, current_amount, start_date, end_date, industry, normalized_contract_id, normalized_epin)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, to_db)
+        (ctr_id, epin, contract_id, contract_title, agency, agency_id, vendor_name, program, procurement_method, contract_type, status, award_amount, current_amount, start_date, end_date, industry, normalized_contract_id, normalized_epin, start_year)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, contract_rows(f, agencies))
+        loaded = cursor.rowcount
+        cursor.executemany("INSERT OR IGNORE INTO agencies (id, name) VALUES (?, ?)", agencies.items())
         conn.commit()
-    print(f"Loaded {len(to_db)} contracts.")
+    print(f"Loaded {loaded} contracts.")
 
 def load_doing_business(conn):
     print("Loading Doing Business Entities...")
     cursor = conn.cursor()
     with open("doing_business_entities.csv", 'r', encoding='utf-8-sig') as f:
-        reader = csv.DictReader(f)
-        to_db = []
-        for row in reader:
-            name = row.get("organization_name")
-            to_db.append((
-                name,
-                row.get("ownership_structure_code"),
-                row.get("organization_phone"),
-                row.get("doing_business_start_date"),
-                clean_name(name)
-            ))
+        to_db = [
+            row + (clean_name(row[0]),)
+            for row in csv_rows(f,
+                "organization_name",
+                "ownership_structure_code",
+                "organization_phone",
+                "doing_business_start_date"
+            )
+        ]
         
         cursor.executemany("""
         INSERT INTO mocs_entities (organization_name, ownership_structure_code, organization_phone, start_date, normalized_name)
@@ -412,18 +480,16 @@ def load_doing_business(conn):
 
     print("Loading Doing Business People...")
     with open("doing_business_people.csv", 'r', encoding='utf-8-sig') as f:
-        reader = csv.DictReader(f)
-        to_db = []
-        for row in reader:
-            org_name = row.get("organization_name")
-            to_db.append((
-                row.get("mocs_peopleid"),
-                org_name,
-                row.get("person_name_first"),
-                row.get("person_name_last"),
-                row.get("relationship_type_code"),
-                clean_name(org_name)
-            ))
+        to_db = [
+            row + (clean_name(row[1]),)
+            for row in csv_rows(f,
+                "mocs_peopleid",
+                "organization_name",
+                "person_name_first",
+                "person_name_last",
+                "relationship_type_code"
+            )
+        ]
             
         cursor.executemany("""
         INSERT INTO mocs_people (mocs_peopleid, organization_name, first_name, last_name, relationship_code, normalized_org_name)
@@ -439,15 +505,12 @@ def load_new_vendor_data(conn):
     if os.path.exists("passport_entity_summary.csv"):
         print("Loading Entity Summary...")
         with open("passport_entity_summary.csv", 'r', encoding='utf-8-sig') as f:
-            reader = csv.DictReader(f)
-            to_db = []
-            for row in reader:
-                 to_db.append((
-                     row.get('Vendor Name'), row.get('Address Line 1'), row.get('Address  Line 2'),
-                     row.get('City'), row.get('State'), row.get('Zip Code'), row.get('Country'),
-                     row.get('Telephone'), row.get('Stock Exchange Symbol'), row.get('For Profit'),
-                     row.get('DUNS number'), row.get('Gross Revenue')
-                 ))
+            to_db = list(csv_rows(f,
+                'Vendor Name', 'Address Line 1', 'Address  Line 2',
+                'City', 'State', 'Zip Code', 'Country',
+                'Telephone', 'Stock Exchange Symbol', 'For Profit',
+                'DUNS number', 'Gross Revenue'
+            ))
             cursor.executemany("INSERT INTO vendor_entity_summary VALUES (?,?,?,?,?,?,?,?,?,?,?,?)", to_db)
             print(f"Loaded {len(to_db)} entity summary records.")
 
@@ -455,13 +518,10 @@ def load_new_vendor_data(conn):
     if os.path.exists("passport_other_names.csv"):
         print("Loading Other Names...")
         with open("passport_other_names.csv", 'r', encoding='utf-8-sig') as f:
-            reader = csv.DictReader(f)
-            to_db = []
-            for row in reader:
-                 to_db.append((
-                     row.get('Vendor Name'), row.get('Other Name Type'), row.get('Other Name'),
-                     row.get('From Date'), row.get('To Date ')
-                 ))
+            to_db = list(csv_rows(f,
+                'Vendor Name', 'Other Name Type', 'Other Name',
+                'From Date', 'To Date '
+            ))
             cursor.executemany("INSERT INTO vendor_other_names VALUES (?,?,?,?,?)", to_db)
             print(f"Loaded {len(to_db)} other names.")
             
@@ -469,14 +529,11 @@ def load_new_vendor_data(conn):
     if os.path.exists("passport_performance_evaluation.csv"):
         print("Loading Evaluations...")
         with open("passport_performance_evaluation.csv", 'r', encoding='utf-8-sig') as f:
-            reader = csv.DictReader(f)
-            to_db = []
-            for row in reader:
-                 to_db.append((
-                     row.get('Vendor Name'), row.get('Agency'), row.get('Contract  ID'),
-                     row.get('Purpose'), row.get('Evaluation Date'), row.get('Evaluation Period Start Date'),
-                     row.get('Evaluation Period End Date'), row.get('Overall Rating')
-                 ))
+            to_db = list(csv_rows(f,
+                'Vendor Name', 'Agency', 'Contract  ID',
+                'Purpose', 'Evaluation Date', 'Evaluation Period Start Date',
+                'Evaluation Period End Date', 'Overall Rating'
+            ))
             cursor.executemany("INSERT INTO vendor_evaluations VALUES (?,?,?,?,?,?,?,?)", to_db)
             print(f"Loaded {len(to_db)} evaluation records.")
             
@@ -484,13 +541,10 @@ def load_new_vendor_data(conn):
     if os.path.exists("passport_principals.csv"):
         print("Loading Principals...")
         with open("passport_principals.csv", 'r', encoding='utf-8-sig') as f:
-            reader = csv.DictReader(f)
-            to_db = []
-            for row in reader:
-                 to_db.append((
-                     row.get('Vendor Name'), row.get('Principal Name'), row.get('Current Title'),
-                     row.get('Principal Ownership Type')
-                 ))
+            to_db = list(csv_rows(f,
+                'Vendor Name', 'Principal Name', 'Current Title',
+                'Principal Ownership Type'
+            ))
             cursor.executemany("INSERT INTO vendor_principals VALUES (?,?,?,?)", to_db)
             print(f"Loaded {len(to_db)} principal records.")
 
@@ -498,14 +552,11 @@ def load_new_vendor_data(conn):
     if os.path.exists("passport_related_entities.csv"):
         print("Loading Related Entities...")
         with open("passport_related_entities.csv", 'r', encoding='utf-8-sig') as f:
-            reader = csv.DictReader(f)
-            to_db = []
-            for row in reader:
-                 to_db.append((
-                     row.get('Vendor Name'), row.get('Related Entity Name'), row.get('Address Line 1'),
-                     row.get('Address Line 2'), row.get('City'), row.get('State'), row.get('Zip Code'),
-                     row.get('Country'), row.get('Telephone'), row.get('Relationship to Vendor')
-                 ))
+            to_db = list(csv_rows(f,
+                'Vendor Name', 'Related Entity Name', 'Address Line 1',
+                'Address Line 2', 'City', 'State', 'Zip Code',
+                'Country', 'Telephone', 'Relationship to Vendor'
+            ))
             cursor.executemany("INSERT INTO vendor_related_entities VALUES (?,?,?,?,?,?,?,?,?,?)", to_db)
             print(f"Loaded {len(to_db)} related entities.")
     conn.commit()
@@ -552,59 +603,60 @@ def load_crol(conn):
     cursor = conn.cursor()
     
     with open("crol_data.csv", 'r', encoding='utf-8-sig') as f:
-        reader = csv.DictReader(f)
         to_db = []
         count = 0
         
-        for row in reader:
-            to_db.append((
-                row.get('RequestID'),
-                row.get('StartDate'),
-                row.get('EndDate'),
-                row.get('AgencyName'),
-                row.get('TypeOfNoticeDescription'),
-                row.get('CategoryDescription'),
-                row.get('ShortTitle'),
-                row.get('SelectionMethodDescription'),
-                row.get('SectionName'),
-                row.get('SpecialCaseReasonDescription'),
-                row.get('PIN'),
-                row.get('DueDate'),
-                row.get('AddressToRequest'),
-                row.get('ContactName'),
-                row.get('ContactPhone'),
-                row.get('Email'),
-                row.get('ContractAmount'),
-                row.get('ContactFax'),
-                row.get('AdditionalDescription1'),
-                row.get('AdditionalDesctription2'),  # Note: typo in source data
-                row.get('AdditionalDescription3'),
-                row.get('OtherInfo1'),
-                row.get('OtherInfo2'),
-                row.get('OtherInfo3'),
-                row.get('VendorName'),
-                row.get('VendorAddress'),
-                row.get('Printout1'),
-                row.get('Printout2'),
-                row.get('Printout3'),
-                row.get('DocumentLinks'),
-                row.get('EventDate'),
-                row.get('EventBuildingName'),
-                row.get('EventStreetAddress1'),
-                row.get('EventStreetAddress2'),
-                row.get('EventCity'),
-                row.get('EventStateCode'),
-                row.get('EventZipCode'),
-                row.get('wegov-org-name'),
-                row.get('wegov-org-id')
-            ))
+        for row in csv_rows(f,
+                'RequestID',
+                'StartDate',
+                'EndDate',
+                'AgencyName',
+                'TypeOfNoticeDescription',
+                'CategoryDescription',
+                'ShortTitle',
+                'SelectionMethodDescription',
+                'SectionName',
+                'SpecialCaseReasonDescription',
+                'PIN',
+                'DueDate',
+                'AddressToRequest',
+                'ContactName',
+                'ContactPhone',
+                'Email',
+                'ContractAmount',
+                'ContactFax',
+                'AdditionalDescription1',
+                'AdditionalDesctription2',  # Note: typo in source data
+                'AdditionalDescription3',
+                'OtherInfo1',
+                'OtherInfo2',
+                'OtherInfo3',
+                'VendorName',
+                'VendorAddress',
+                'Printout1',
+                'Printout2',
+                'Printout3',
+                'DocumentLinks',
+                'EventDate',
+                'EventBuildingName',
+                'EventStreetAddress1',
+                'EventStreetAddress2',
+                'EventCity',
+                'EventStateCode',
+                'EventZipCode',
+                'wegov-org-name',
+                'wegov-org-id'
+        ):
+            pin = row[10]
+            # Indexed join key for matching PINs against normalized EPINs
+            to_db.append(row + (pin.replace('-', '').upper() if pin is not None else None,))
             
             count += 1
             if count % 100000 == 0:
                 print(f"  Processed {count:,} CROL records...")
                 
         cursor.executemany("""
-        INSERT OR IGNORE INTO crol VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)
+        INSERT OR IGNORE INTO crol VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)
         """, to_db)
         conn.commit()
         
@@ -615,31 +667,231 @@ def create_indices(conn):
     print("Creating indices...")
     cursor = conn.cursor()
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_contracts_norm_id ON contracts(normalized_contract_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_contracts_cid ON contracts(contract_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_contracts_ctrid ON contracts(ctr_id)")
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_contracts_norm_epin ON contracts(normalized_epin)")
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_solicit_norm_epin ON solicitations(normalized_epin)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_contracts_start_year ON contracts(start_year, award_amount)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_solicit_release_year ON solicitations(release_year)")
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_contracts_vendor_name ON contracts(vendor_name)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_contracts_vendor_start ON contracts(vendor_name, start_date)")
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_vendors_name ON vendors(name)")
     
+    # Columns the STATS_QUERIES group on, so each breakdown is a covering
+    # index scan. vendor_categories filters out blank categories, which the
+    # partial index leaves out; the others count every row (percentages use
+    # the full total) and need a full index.
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_vendors_cert ON vendors(certification_type)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_vendors_ethnicity ON vendors(ethnicity)")
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_vendors_category ON vendors(business_category)
+        WHERE business_category IS NOT NULL AND business_category != ''
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_contracts_status ON contracts(status)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_solicit_status ON solicitations(rfx_status)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_solicit_method ON solicitations(procurement_method)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_solicit_agency ON solicitations(agency)")
+    
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_mocs_ent_match ON mocs_entities(matched_vendor_id)")
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_mocs_ppl_norm ON mocs_people(normalized_org_name)")
+    
+    # CROL indexes are built after load_crol so the bulk insert doesn't maintain them
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_crol_pin ON crol(PIN, RequestID, AgencyName)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_crol_agency ON crol(AgencyName)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_crol_vendor ON crol(VendorName)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_crol_normpin ON crol(normalized_pin)")
+    conn.commit()
+
+# Trigram FTS5 indexes over the columns the MCP search tools match with LIKE '%x%'.
+# The trigram tokenizer answers LIKE on the FTS table from the index, so the
+# substring semantics stay the same as a plain LIKE on the base table.
+SEARCH_INDEXES = {
+    'vendors': ('name',),
+    'contracts': ('contract_id', 'contract_title', 'vendor_name', 'agency'),
+    'solicitations': ('epin', 'procurement_name', 'agency'),
+}
+
+def create_search_indexes(conn):
+    print("Creating search indexes...")
+    cursor = conn.cursor()
+    for table, columns in SEARCH_INDEXES.items():
+        cursor.execute(f"DROP TABLE IF EXISTS {table}_fts")
+        cursor.execute(f"""
+            CREATE VIRTUAL TABLE {table}_fts USING fts5(
+                {', '.join(columns)}, content='{table}', content_rowid='rowid', tokenize='trigram'
+            )
+        """)
+        cursor.execute(f"INSERT INTO {table}_fts({table}_fts) VALUES('rebuild')")
+    conn.commit()
+
+# Aggregates behind the MCP server's overview/stats tools. They only change when
+# the database is rebuilt, so build_stats_cache stores each result set as JSON in
+# stats_cache; the server reads them back by key (see mcp_server.stats_rows).
+# {where} is empty here; the server fills it in for filtered, uncached variants.
+STATS_QUERIES = {
+    'overview': """
+        SELECT 'vendors' as tag, NULL as label, COUNT(*) as count,
+               NULL as total_value, NULL as avg_value, NULL as agency_count, NULL as vendor_count
+        FROM vendors
+        UNION ALL
+        SELECT 'contracts', NULL, COUNT(*),
+               SUM(award_amount), AVG(award_amount), COUNT(DISTINCT agency), COUNT(DISTINCT vendor_name)
+        FROM contracts
+        UNION ALL
+        SELECT 'solicitations', NULL, COUNT(*), NULL, NULL, NULL, NULL FROM solicitations
+        UNION ALL
+        SELECT 'agencies', NULL, COUNT(*), NULL, NULL, NULL, NULL FROM agencies
+        UNION ALL
+        SELECT * FROM (
+            SELECT 'contract_status', status, COUNT(*) as count, NULL, NULL, NULL, NULL
+            FROM contracts 
+            GROUP BY status 
+            ORDER BY count DESC 
+            LIMIT 5
+        )
+        UNION ALL
+        SELECT * FROM (
+            SELECT 'sol_status', rfx_status, COUNT(*) as count, NULL, NULL, NULL, NULL
+            FROM solicitations 
+            GROUP BY rfx_status 
+            ORDER BY count DESC 
+            LIMIT 5
+        )
+    """,
+    'vendor_total': "SELECT COUNT(*) as c FROM vendors",
+    'vendor_certifications': """
+        SELECT certification_type, count, pct FROM (
+            SELECT certification_type, COUNT(*) as count,
+                   100.0 * COUNT(*) / SUM(COUNT(*)) OVER () as pct
+            FROM vendors
+            GROUP BY certification_type
+        )
+        WHERE certification_type IS NOT NULL AND certification_type != ''
+        ORDER BY count DESC
+        LIMIT 10
+    """,
+    'vendor_ethnicities': """
+        SELECT ethnicity, count, pct FROM (
+            SELECT ethnicity, COUNT(*) as count,
+                   100.0 * COUNT(*) / SUM(COUNT(*)) OVER () as pct
+            FROM vendors
+            GROUP BY ethnicity
+        )
+        WHERE ethnicity IS NOT NULL AND ethnicity != ''
+        ORDER BY count DESC
+        LIMIT 10
+    """,
+    'vendor_categories': """
+        SELECT business_category, COUNT(*) as count
+        FROM vendors
+        WHERE business_category IS NOT NULL AND business_category != ''
+        GROUP BY business_category
+        ORDER BY count DESC
+        LIMIT 10
+    """,
+    'solicitation_status': """
+        SELECT rfx_status, COUNT(*) as count,
+               SUM(COUNT(*)) OVER () as total,
+               100.0 * COUNT(*) / SUM(COUNT(*)) OVER () as pct
+        FROM solicitations
+        {where}
+        GROUP BY rfx_status
+        ORDER BY count DESC
+    """,
+    'solicitation_methods': """
+        SELECT procurement_method, COUNT(*) as count
+        FROM solicitations
+        {where}
+        GROUP BY procurement_method
+        ORDER BY count DESC
+        LIMIT 10
+    """,
+    'solicitation_agencies': """
+        SELECT agency, COUNT(*) as count
+        FROM solicitations
+        GROUP BY agency
+        ORDER BY count DESC
+        LIMIT 10
+    """,
+    'yearly_contracts': """
+        SELECT 
+            start_year as year,
+            COUNT(*) as count,
+            SUM(award_amount) as total_value
+        FROM contracts
+        WHERE start_year IS NOT NULL
+        GROUP BY start_year
+        ORDER BY start_year DESC
+        LIMIT 10
+    """,
+    'yearly_solicitations': """
+        SELECT 
+            release_year as year,
+            COUNT(*) as count
+        FROM solicitations
+        WHERE release_year IS NOT NULL
+        GROUP BY release_year
+        ORDER BY release_year DESC
+        LIMIT 10
+    """,
+}
+
+def build_stats_cache(conn):
+    print("Building stats cache...")
+    cursor = conn.cursor()
+    cursor.execute("DROP TABLE IF EXISTS stats_cache")
+    cursor.execute("CREATE TABLE stats_cache (key TEXT PRIMARY KEY, json TEXT)")
+    
+    for key, query in STATS_QUERIES.items():
+        cursor.execute(query.format(where=""))
+        columns = [d[0] for d in cursor.description]
+        rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+        cursor.execute("INSERT INTO stats_cache (key, json) VALUES (?, ?)", (key, json.dumps(rows)))
+    conn.commit()
+
+def build_count_tables(conn):
+    # Contract counts per agency and per status, indexed by count, so "top N"
+    # listings read the first rows of an index instead of grouping and
+    # sorting the contracts table on every request
+    print("Building count tables...")
+    cursor = conn.cursor()
+    for column in ('agency', 'status'):
+        cursor.execute(f"DROP TABLE IF EXISTS {column}_counts")
+        cursor.execute(f"""
+            CREATE TABLE {column}_counts AS
+            SELECT {column}, COUNT(*) as n, SUM(award_amount) as total
+            FROM contracts
+            GROUP BY {column}
+        """)
+        cursor.execute(f"CREATE INDEX idx_{column}_counts_n ON {column}_counts(n DESC)")
     conn.commit()
 
 if __name__ == "__main__":
-    if os.path.exists(DB_FILE):
-        os.remove(DB_FILE)
+    # Include any -wal/-shm left by the previous build's WAL mode
+    for path in (DB_FILE, DB_FILE + "-wal", DB_FILE + "-shm"):
+        if os.path.exists(path):
+            os.remove(path)
         
     conn = sqlite3.connect(DB_FILE)
     init_db(conn)
     
-    load_vendors(conn)
-    load_solicitations(conn)
-    load_contracts(conn)
-    load_doing_business(conn)
-    load_new_vendor_data(conn)
-    load_crol(conn)
-    match_entities_to_vendors(conn)
+    with bulk_load_pragmas(conn):
+        load_vendors(conn)
+        load_solicitations(conn)
+        load_contracts(conn)
+        load_doing_business(conn)
+        load_new_vendor_data(conn)
+        load_crol(conn)
+        match_entities_to_vendors(conn)
     
     create_indices(conn)
+    create_search_indexes(conn)
+    build_stats_cache(conn)
+    build_count_tables(conn)
+    
+    # WAL is persistent in the file; the server's read-only connections can't
+    # switch it themselves, so the build leaves the database in WAL mode
+    conn.execute("PRAGMA journal_mode=WAL")
     
     # Simple Verification
     cursor = conn.cursor()
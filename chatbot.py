@@ -6,6 +6,7 @@ tools as the MCP server.
 """
 
 import os
+from types import MappingProxyType
 from typing import Optional
 from google import genai
 from google.genai import types
@@ -40,21 +41,6 @@ def get_client():
     return _client
 
 
-# Tool function registry (get_chart_data added after its definition)
-TOOL_FUNCTIONS = {
-    "search_vendors": search_vendors,
-    "get_vendor_profile": get_vendor_profile,
-    "search_contracts": search_contracts,
-    "get_contract_details": get_contract_details,
-    "search_solicitations": search_solicitations,
-    "get_solicitation_details": get_solicitation_details,
-    "search_transactions": search_transactions,
-    "get_vendor_spending": get_vendor_spending,
-    "get_spending_by_year": get_spending_by_year,
-    "get_datasets_info": get_datasets_info,
-}
-
-
 def get_tools():
     """Define tool declarations for Gemini function calling."""
     return [
@@ -198,7 +184,7 @@ def get_chart_data(chart_type: str, data_type: str, fiscal_year: int = 2024, lim
     Returns a JSON string with Chart.js compatible configuration.
     """
     import json
-    from mcp_server import query_db, get_spending_connection, get_spending_files
+    from mcp_server import contract_counts, get_spending_connection, get_spending_files
     
     chart_config = {
         "type": chart_type,
@@ -215,16 +201,16 @@ def get_chart_data(chart_type: str, data_type: str, fiscal_year: int = 2024, lim
     
     try:
         if data_type == "spending_by_agency":
-            con = get_spending_connection()
-            files = get_spending_files(fiscal_year)
-            result = con.execute(f"""
-                SELECT agency, SUM(TRY_CAST(check_amount AS DOUBLE)) as total
-                FROM read_parquet({files}, union_by_name=true)
+            cur = get_spending_connection().cursor()
+            result = cur.execute("""
+                SELECT agency, SUM(check_amount) as total
+                FROM v_spending
+                WHERE fiscal_year = ?
                 GROUP BY agency
                 ORDER BY total DESC
-                LIMIT {limit}
-            """).fetchall()
-            con.close()
+                LIMIT ?
+            """, [fiscal_year, limit]).fetchall()
+            cur.close()
             
             labels = [r[0][:30] for r in result]  # Truncate long names
             data = [round(r[1] / 1e9, 2) for r in result]  # Convert to billions
@@ -236,19 +222,31 @@ def get_chart_data(chart_type: str, data_type: str, fiscal_year: int = 2024, lim
             chart_config["options"]["plugins"] = {"title": {"display": True, "text": f"Top {limit} Agencies by Spending - FY{fiscal_year}"}}
             
         elif data_type == "spending_by_year":
-            con = get_spending_connection()
-            totals = []
-            for fy in range(2020, 2025):
-                try:
-                    files = get_spending_files(fy)
-                    result = con.execute(f"""
-                        SELECT SUM(TRY_CAST(check_amount AS DOUBLE)) as total
-                        FROM read_parquet({files}, union_by_name=true)
-                    """).fetchone()
-                    totals.append((fy, round(result[0] / 1e9, 2) if result[0] else 0))
-                except:
-                    totals.append((fy, 0))
-            con.close()
+            years = range(2020, 2025)
+            cur = get_spending_connection().cursor()
+            try:
+                by_year = dict(cur.execute("""
+                    SELECT fiscal_year, SUM(check_amount) as total
+                    FROM v_spending
+                    WHERE fiscal_year BETWEEN ? AND ?
+                    GROUP BY fiscal_year
+                """, [years[0], years[-1]]).fetchall())
+            except Exception:
+                # One unreadable or drifted partition fails the whole scan; total
+                # each year on its own so only that year drops out of the chart
+                by_year = {}
+                for fy in years:
+                    try:
+                        by_year[fy] = cur.execute(f"""
+                            SELECT SUM(TRY_CAST(check_amount AS DOUBLE))
+                            FROM read_parquet({get_spending_files(fy)}, union_by_name=true)
+                        """).fetchone()[0]
+                    except Exception:
+                        pass
+            finally:
+                cur.close()
+            
+            totals = [(fy, round(by_year[fy] / 1e9, 2) if by_year.get(fy) else 0) for fy in years]
             
             chart_config["data"]["labels"] = [f"FY{t[0]}" for t in totals]
             chart_config["data"]["datasets"][0]["data"] = [t[1] for t in totals]
@@ -257,13 +255,7 @@ def get_chart_data(chart_type: str, data_type: str, fiscal_year: int = 2024, lim
             chart_config["options"]["plugins"] = {"title": {"display": True, "text": "NYC Spending by Fiscal Year"}}
             
         elif data_type == "contracts_by_agency":
-            result = query_db("""
-                SELECT agency, COUNT(*) as count
-                FROM contracts
-                GROUP BY agency
-                ORDER BY count DESC
-                LIMIT ?
-            """, (limit,))
+            result = contract_counts('agency', limit)
             
             labels = [r['agency'][:25] for r in result]
             data = [r['count'] for r in result]
@@ -275,12 +267,7 @@ def get_chart_data(chart_type: str, data_type: str, fiscal_year: int = 2024, lim
             chart_config["options"]["plugins"] = {"title": {"display": True, "text": f"Top {limit} Agencies by Contract Count"}}
             
         elif data_type == "contracts_by_status":
-            result = query_db("""
-                SELECT status, COUNT(*) as count
-                FROM contracts
-                GROUP BY status
-                ORDER BY count DESC
-            """)
+            result = contract_counts('status')
             
             labels = [r['status'] or 'Unknown' for r in result]
             data = [r['count'] for r in result]
@@ -300,14 +287,27 @@ def get_chart_data(chart_type: str, data_type: str, fiscal_year: int = 2024, lim
         return f"Error generating chart data: {str(e)}"
 
 
-# Add get_chart_data to the registry
-TOOL_FUNCTIONS["get_chart_data"] = get_chart_data
+# Tool function registry (read-only; looked up on every function call hop)
+TOOL_FUNCTIONS = MappingProxyType({
+    "search_vendors": search_vendors,
+    "get_vendor_profile": get_vendor_profile,
+    "search_contracts": search_contracts,
+    "get_contract_details": get_contract_details,
+    "search_solicitations": search_solicitations,
+    "get_solicitation_details": get_solicitation_details,
+    "search_transactions": search_transactions,
+    "get_vendor_spending": get_vendor_spending,
+    "get_spending_by_year": get_spending_by_year,
+    "get_datasets_info": get_datasets_info,
+    "get_chart_data": get_chart_data,
+})
 
 
 def execute_function(name: str, args: dict) -> str:
     """Execute a tool function and return the result."""
-    func = TOOL_FUNCTIONS.get(name)
-    if not func:
+    try:
+        func = TOOL_FUNCTIONS[name]
+    except KeyError:
         return f"Unknown function: {name}"
     
     try:
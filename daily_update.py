@@ -5,6 +5,7 @@ import duckdb
 import requests
 import xml.etree.ElementTree as ET
 import csv
+import time
 from datetime import datetime
 from pathlib import Path
 
@@ -14,6 +15,9 @@ from download_nyc_spending import make_api_request, parse_transactions, load_pro
 # Configuration
 API_URL = "https://www.checkbooknyc.com/api"
 
+# Reuse the last remote record count for this long before probing the API again
+PROBE_MAX_AGE_SECONDS = 3600
+
 def get_current_fiscal_year():
     """Calculate NYC Fiscal Year (July 1st starts new FY)"""
     today = datetime.now()
@@ -43,14 +47,28 @@ def daily_update():
     print(f"Local state: {last_count:,} records downloaded so far.")
 
     # 2. Check Remote State
-    print("Querying API for current record count...")
-    response = make_api_request(1, 1, fiscal_year) # Just get 1 record to get the header count
-    if response.status_code != 200:
-        print(f"Error checking API: {response.status_code}")
-        return
+    probe = progress.get('probe') or {}
+    if probe.get('total') is not None and time.time() - probe.get('probed_at', 0) < PROBE_MAX_AGE_SECONDS:
+        total_records_remote = probe['total']
+        print(f"Remote state (cached probe): {total_records_remote:,} records available.")
+    else:
+        print("Querying API for current record count...")
+        response = make_api_request(1, 1, fiscal_year) # Just get 1 record to get the header count
+        if response.status_code != 200:
+            print(f"Error checking API: {response.status_code}")
+            return
 
-    _, total_records_remote = parse_transactions(response.text)
-    print(f"Remote state: {total_records_remote:,} records available.")
+        _, total_records_remote = parse_transactions(response.text)
+        print(f"Remote state: {total_records_remote:,} records available.")
+
+        # Remember the probe (and any cache validators) so reruns can skip it
+        progress['probe'] = {
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'probed_at': time.time(),
+            'total': total_records_remote,
+        }
+        save_progress(progress, progress_file)
 
     # 3. Calculate Delta
     new_records_count = total_records_remote - last_count
@@ -5,13 +5,41 @@ Downloads from S3 and imports into SQLite.
 """
 
 import sqlite3
-import csv
 import os
+import queue
+import threading
+
+import duckdb
 
 DB_FILE = "databook.db"
 CROL_CSV = "crol_data.csv"
 CROL_URL = "https://wegov-research-api.s3.amazonaws.com/crol"
 
+# Rows fetched from DuckDB and inserted into SQLite per executemany call
+BATCH_SIZE = 50000
+
+# Rows inserted between commits, so the journal doesn't grow unbounded
+COMMIT_EVERY = 500000
+
+# Filtered batches buffered between the DuckDB reader thread and the SQLite writer
+READ_AHEAD_BATCHES = 4
+
+# PIN values that are placeholder text rather than real PINs
+INVALID_PINS = ('NOPINFOUND', 'SEE BELOW', 'LINE 17 BELOW', 'SEE LINE 17 BELOW', 'LINE 17')
+
+# CSV columns in crol table order
+CROL_COLUMNS = [
+    'RequestID', 'StartDate', 'EndDate', 'AgencyName', 'TypeOfNoticeDescription',
+    'CategoryDescription', 'ShortTitle', 'SelectionMethodDescription', 'SectionName',
+    'SpecialCaseReasonDescription', 'PIN', 'DueDate', 'AddressToRequest', 'ContactName',
+    'ContactPhone', 'Email', 'ContractAmount', 'ContactFax', 'AdditionalDescription1',
+    'AdditionalDesctription2',  # Note: typo in source
+    'AdditionalDescription3', 'OtherInfo1', 'OtherInfo2', 'OtherInfo3', 'VendorName',
+    'VendorAddress', 'Printout1', 'Printout2', 'Printout3', 'DocumentLinks', 'EventDate',
+    'EventBuildingName', 'EventStreetAddress1', 'EventStreetAddress2', 'EventCity',
+    'EventStateCode', 'EventZipCode', 'wegov-org-name', 'wegov-org-id',
+]
+
 
 def download_crol():
     """Download CROL data from S3 if not present."""
@@ -26,7 +54,7 @@ def download_crol():
 
 
 def create_crol_table(conn):
-    """Create CROL table and indexes."""
+    """Create CROL table (indexes are built by finalize_crol after loading)."""
     cursor = conn.cursor()
     
     # Drop existing table if present
@@ -72,99 +100,117 @@ def create_crol_table(conn):
         EventStateCode TEXT,
         EventZipCode TEXT,
         wegov_org_name TEXT,
-        wegov_org_id TEXT
+        wegov_org_id TEXT,
+        normalized_pin TEXT
     )
     """)
     
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_crol_pin ON crol(PIN)")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_crol_agency ON crol(AgencyName)")
-    cursor.execute("CREATE INDEX IF NOT EXISTS idx_crol_vendor ON crol(VendorName)")
     conn.commit()
     print("CROL table created.")
 
 
+def _read_batches(result, batches, stop):
+    """Fetch filtered CROL rows from DuckDB and hand them to the SQLite writer until stopped."""
+    try:
+        while not stop.is_set():
+            batch = result.fetchmany(BATCH_SIZE)
+            batches.put(batch)
+            if not batch:
+                return
+    except Exception as e:
+        batches.put(e)
+
+
 def load_crol(conn):
-    """Load CROL data from CSV."""
+    """Load CROL data from CSV, filtering out unmatchable PINs inside DuckDB."""
     print("Loading CROL data...")
     cursor = conn.cursor()
     
-    with open(CROL_CSV, 'r', encoding='utf-8-sig') as f:
-        reader = csv.DictReader(f)
-        to_db = []
-        count = 0
-        
-        for row in reader:
-            # Skip records without PIN - we can't match them to solicitations/contracts
-            pin = row.get('PIN', '').strip()
-            if not pin:
-                continue
-            
-            # Skip invalid PINs (text like "SEE BELOW", "NoPINFound", etc.)
-            # Valid PINs should be alphanumeric and at least 8 characters
-            if len(pin) < 8:
-                continue
-            if pin.upper() in ('NOPINFOUND', 'SEE BELOW', 'LINE 17 BELOW', 'SEE LINE 17 BELOW', 'LINE 17'):
-                continue
-            # Skip PINs that are all zeros or mostly zeros
-            if pin.replace('0', '').replace('.', '') == '':
-                continue
-            # Skip PINs that start with common invalid patterns
-            if pin.lower().startswith('see ') or pin.lower().startswith('line '):
-                continue
-                
-            to_db.append((
-                row.get('RequestID'),
-                row.get('StartDate'),
-                row.get('EndDate'),
-                row.get('AgencyName'),
-                row.get('TypeOfNoticeDescription'),
-                row.get('CategoryDescription'),
-                row.get('ShortTitle'),
-                row.get('SelectionMethodDescription'),
-                row.get('SectionName'),
-                row.get('SpecialCaseReasonDescription'),
-                row.get('PIN'),
-                row.get('DueDate'),
-                row.get('AddressToRequest'),
-                row.get('ContactName'),
-                row.get('ContactPhone'),
-                row.get('Email'),
-                row.get('ContractAmount'),
-                row.get('ContactFax'),
-                row.get('AdditionalDescription1'),
-                row.get('AdditionalDesctription2'),  # Note: typo in source
-                row.get('AdditionalDescription3'),
-                row.get('OtherInfo1'),
-                row.get('OtherInfo2'),
-                row.get('OtherInfo3'),
-                row.get('VendorName'),
-                row.get('VendorAddress'),
-                row.get('Printout1'),
-                row.get('Printout2'),
-                row.get('Printout3'),
-                row.get('DocumentLinks'),
-                row.get('EventDate'),
-                row.get('EventBuildingName'),
-                row.get('EventStreetAddress1'),
-                row.get('EventStreetAddress2'),
-                row.get('EventCity'),
-                row.get('EventStateCode'),
-                row.get('EventZipCode'),
-                row.get('wegov-org-name'),
-                row.get('wegov-org-id')
-            ))
-            
-            count += 1
-            if count % 100000 == 0:
+    # Empty CSV fields come back as NULL from DuckDB; keep them as '' like csv.DictReader
+    columns = ", ".join(f"COALESCE(\"{col}\", '')" for col in CROL_COLUMNS)
+    # normalized_pin: indexed join key for matching PINs against normalized EPINs
+    columns += ", upper(replace(COALESCE(\"PIN\", ''), '-', ''))"
+    invalid_pins = ", ".join(f"'{pin}'" for pin in INVALID_PINS)
+    # Strip leading/trailing whitespace like str.strip(): DuckDB's trim() only
+    # removes spaces. The class is exactly the characters str.isspace() accepts.
+    space = r"[\t-\r\x{1c}-\x{1f}\x{85}\p{Z}]"
+    
+    duck = duckdb.connect()
+    result = duck.execute(f"""
+        SELECT {columns}
+        FROM (
+            SELECT *, upper(regexp_replace(PIN, '^{space}+|{space}+$', '', 'g')) AS pin_key
+            FROM read_csv_auto('{CROL_CSV}', all_varchar=1)
+        )
+        -- Skip records without a usable PIN - we can't match them to solicitations/contracts.
+        -- Valid PINs are at least 8 characters and not placeholder text or all zeros.
+        WHERE length(pin_key) >= 8
+          AND pin_key NOT IN ({invalid_pins})
+          AND NOT regexp_full_match(pin_key, '[0.]+')
+          AND NOT starts_with(pin_key, 'SEE ')
+          AND NOT starts_with(pin_key, 'LINE ')
+    """)
+    
+    # Manage the transaction explicitly: one BEGIN, a COMMIT every COMMIT_EVERY rows
+    isolation_level = conn.isolation_level
+    conn.isolation_level = None
+    
+    # DuckDB parses and filters (multi-threaded, GIL released) on a reader thread
+    # while this thread does the serialized SQLite writes.
+    batches = queue.Queue(maxsize=READ_AHEAD_BATCHES)
+    stop = threading.Event()
+    reader = threading.Thread(target=_read_batches, args=(result, batches, stop), daemon=True)
+    reader.start()
+    
+    count = 0
+    try:
+        cursor.execute("BEGIN")
+        while True:
+            batch = batches.get()
+            if isinstance(batch, Exception):
+                raise batch
+            if not batch:
+                break
+            cursor.executemany("""
+            INSERT OR IGNORE INTO crol VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)
+            """, batch)
+            count += len(batch)
+            if count % COMMIT_EVERY == 0:
+                cursor.execute("COMMIT")
+                cursor.execute("BEGIN")
                 print(f"  Processed {count:,} records...")
-        
-        # Batch insert
-        cursor.executemany("""
-        INSERT OR IGNORE INTO crol VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)
-        """, to_db)
-        conn.commit()
-        
-    print(f"Loaded {len(to_db):,} CROL records.")
+        cursor.execute("COMMIT")
+    except BaseException:
+        if conn.in_transaction:
+            cursor.execute("ROLLBACK")
+        raise
+    finally:
+        conn.isolation_level = isolation_level
+        # Stop the reader, draining the queue so a put blocked on it can return
+        stop.set()
+        while reader.is_alive():
+            try:
+                while True:
+                    batches.get_nowait()
+            except queue.Empty:
+                pass
+            reader.join(timeout=0.1)
+        duck.close()
+    
+    print(f"Loaded {count:,} CROL records.")
+
+
+def finalize_crol(conn):
+    """Build CROL indexes after the bulk insert and refresh planner statistics."""
+    print("Creating CROL indexes...")
+    cursor = conn.cursor()
+    # Covering index for PIN lookups/joins that also need the request and agency
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_crol_pin ON crol(PIN, RequestID, AgencyName)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_crol_agency ON crol(AgencyName)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_crol_vendor ON crol(VendorName)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_crol_normpin ON crol(normalized_pin)")
+    cursor.execute("ANALYZE crol")
+    conn.commit()
 
 
 def verify(conn):
@@ -201,6 +247,7 @@ if __name__ == "__main__":
     conn = sqlite3.connect(DB_FILE)
     create_crol_table(conn)
     load_crol(conn)
+    finalize_crol(conn)
     verify(conn)
     conn.close()
     
@@ -14,13 +14,24 @@ Usage:
     python mcp_server.py
 """
 
+import atexit
+import functools
+import json
 import os
+import queue
 import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
 from typing import Optional
 
 import duckdb
+from cachetools import LRUCache, TTLCache
+from cachetools.keys import hashkey
 from mcp.server.fastmcp import FastMCP
 
+from build_database import STATS_QUERIES
+
 # Initialize MCP server
 mcp = FastMCP("oce")
 
@@ -32,68 +43,311 @@ DB_FILE = os.path.join(os.path.dirname(__file__), "databook.db")
 # Database Helpers
 # ============================================================================
 
-def get_db():
-    """Get SQLite database connection with row factory."""
-    db = sqlite3.connect(DB_FILE)
+# Pool of read-only SQLite connections shared by all threads. Each stays open
+# across tool calls so the schema is parsed once and the page cache stays warm.
+# Overlapping queries beyond DB_POOL_SIZE get a connection that is closed
+# afterwards instead of being pooled.
+DB_POOL_SIZE = 8
+_DB_POOL = queue.Queue(maxsize=DB_POOL_SIZE)
+_DB_CONNECTIONS = []
+_DB_CONNECTIONS_LOCK = threading.Lock()
+
+
+def db_stamp():
+    """
+    Identify the current contents of databook.db; a rebuild replaces or rewrites it.
+    
+    The database is in WAL mode, so commits from other writers (import_crol,
+    test_crol_matching) land in databook.db-wal and reach the main file only
+    at a checkpoint; the -wal file's mtime and size are part of the stamp too.
+    """
+    st = os.stat(DB_FILE)
+    try:
+        wal = os.stat(DB_FILE + "-wal")
+        wal_stamp = (wal.st_mtime_ns, wal.st_size)
+    except FileNotFoundError:
+        wal_stamp = None
+    return (st.st_ino, st.st_mtime_ns, wal_stamp)
+
+
+def open_db():
+    """Open a read-only SQLite connection to databook.db; returns (connection, db_stamp)."""
+    # Stamp before connecting so a rebuild racing the open is caught next use
+    stamp = db_stamp()
+    # Tools issue a few dozen distinct SQL strings (more with the filter
+    # combinations); keep all of them prepared instead of the default 128
+    db = sqlite3.connect(f"file:{DB_FILE}?mode=ro", uri=True, check_same_thread=False,
+                         cached_statements=256)
     db.row_factory = sqlite3.Row
-    return db
+    db.execute("PRAGMA mmap_size=268435456")  # 256 MB
+    db.execute("PRAGMA cache_size=-200000")  # ~200 MB
+    db.execute("PRAGMA temp_store=MEMORY")
+    with _DB_CONNECTIONS_LOCK:
+        _DB_CONNECTIONS.append(db)
+    return db, stamp
+
+
+def discard_db(db):
+    """Close a connection that is not going back into the pool."""
+    with _DB_CONNECTIONS_LOCK:
+        if db in _DB_CONNECTIONS:
+            _DB_CONNECTIONS.remove(db)
+    db.close()
+
+
+def init_db_pool():
+    """Pre-open pooled connections so the first requests don't pay for them."""
+    while not _DB_POOL.full():
+        try:
+            _DB_POOL.put_nowait(open_db())
+        except queue.Full:
+            break
+
+
+@atexit.register
+def close_db():
+    """Close every pooled SQLite connection."""
+    with _DB_CONNECTIONS_LOCK:
+        while _DB_CONNECTIONS:
+            _DB_CONNECTIONS.pop().close()
 
 
 def query_db(query: str, args: tuple = (), one: bool = False):
-    """Execute a SQLite query and return results."""
-    db = get_db()
-    cur = db.execute(query, args)
-    rv = cur.fetchall()
-    db.close()
+    """Execute a SQLite query on a pooled connection and return results."""
+    try:
+        db, stamp = _DB_POOL.get_nowait()
+    except queue.Empty:
+        db, stamp = open_db()
+    
+    # A connection opened before build_database replaced databook.db keeps
+    # reading the old (unlinked) file; reopen it against the new one
+    if stamp != db_stamp():
+        discard_db(db)
+        db, stamp = open_db()
+    
+    try:
+        cur = db.execute(query, args)
+        rv = cur.fetchall()
+        cur.close()
+    finally:
+        try:
+            _DB_POOL.put_nowait((db, stamp))
+        except queue.Full:
+            discard_db(db)
     return (rv[0] if rv else None) if one else rv
 
 
+# Query results keyed by (query, args, one); each entry remembers the
+# db_stamp() it was computed against so a rebuild or reload invalidates it.
+_QCACHE = OrderedDict()
+_QCACHE_LOCK = threading.Lock()
+QCACHE_MAX_ENTRIES = 128
+
+
+def cached_query_db(query: str, args: tuple = (), one: bool = False):
+    """Execute a SQLite query, reusing the result until databook.db changes."""
+    stamp = db_stamp()
+    key = (query, tuple(args), one)
+    
+    with _QCACHE_LOCK:
+        hit = _QCACHE.get(key)
+        if hit and hit[0] == stamp:
+            _QCACHE.move_to_end(key)
+            return hit[1]
+    
+    result = query_db(query, args, one)
+    
+    with _QCACHE_LOCK:
+        _QCACHE[key] = (stamp, result)
+        _QCACHE.move_to_end(key)
+        if len(_QCACHE) > QCACHE_MAX_ENTRIES:
+            _QCACHE.popitem(last=False)
+    return result
+
+
+def stats_rows(key: str, where: str = "", params: tuple = ()):
+    """
+    Get the rows of one of build_database.STATS_QUERIES.
+    
+    Unfiltered results are read from the stats_cache table written when the
+    database is built; filtered ones (or an older database without the
+    table) run the query live.
+    """
+    if not where:
+        try:
+            cached = query_db("SELECT json FROM stats_cache WHERE key = ?", (key,), one=True)
+        except sqlite3.OperationalError:
+            cached = None
+        if cached:
+            return json.loads(cached['json'])
+    return query_db(STATS_QUERIES[key].format(where=where), params)
+
+
+def contract_counts(column: str, limit: int = -1):
+    """
+    Get contract counts and award totals per agency or status, largest first.
+    
+    Read from the agency_counts/status_counts tables written when the
+    database is built; an older database without them groups live.
+    """
+    try:
+        return cached_query_db(
+            f"SELECT {column}, n as count, total FROM {column}_counts ORDER BY n DESC LIMIT ?",
+            (limit,)
+        )
+    except sqlite3.OperationalError:
+        return cached_query_db(
+            f"""
+            SELECT {column}, COUNT(*) as count, SUM(award_amount) as total
+            FROM contracts
+            GROUP BY {column}
+            ORDER BY count DESC
+            LIMIT ?
+            """,
+            (limit,)
+        )
+
+
+# Shared DuckDB connection, created on first use. Installing/loading httpfs
+# and warming its metadata cache is the bulk of a small query's latency.
+_DUCK_CON = None
+_DUCK_LOCK = threading.Lock()
+
+
 def get_spending_connection():
-    """Get DuckDB connection configured for HTTPS access to public S3 bucket."""
-    con = duckdb.connect()
-    con.execute("INSTALL httpfs; LOAD httpfs;")
-    return con
+    """
+    Get the shared DuckDB connection configured for HTTPS access to public S3 bucket.
+    
+    The connection has a v_spending view over every fiscal_year partition,
+    with check_amount already cast to DOUBLE.
+    
+    Don't close it; run queries on a .cursor() and close that instead, which
+    is also what makes concurrent tool calls safe.
+    """
+    global _DUCK_CON
+    with _DUCK_LOCK:
+        if _DUCK_CON is None:
+            con = duckdb.connect()
+            con.execute("INSTALL httpfs; LOAD httpfs;")
+            con.execute("SET enable_http_metadata_cache=true; SET enable_object_cache=true;")
+            # Reuse connections across the many footer/range requests of a scan
+            con.execute("SET http_keep_alive=true; SET http_retries=3; SET http_timeout=30;")
+            con.execute(f"SET threads={os.cpu_count() or 4};")
+            con.execute("SET s3_region='us-east-1';")
+            create_spending_view(con)
+            _DUCK_CON = con
+    return _DUCK_CON
+
+
+def create_spending_view(con):
+    """
+    Create the v_spending view over every fiscal_year partition on a DuckDB connection.
+    
+    Tools query this view instead of splicing read_parquet() into each
+    statement; filter on fiscal_year to prune partitions.
+    """
+    con.execute(f"""
+        CREATE OR REPLACE VIEW v_spending AS
+        SELECT {SPENDING_COLUMNS} FROM read_parquet(
+            {get_spending_files()},
+            hive_partitioning=true,
+            hive_types={{'fiscal_year': INTEGER}}
+        )
+    """)
+
+
+def run_spending_queries(*queries):
+    """
+    Run independent DuckDB queries concurrently, each on its own cursor.
+    
+    DuckDB releases the GIL while executing, so S3-bound scans overlap.
+    
+    Returns:
+        List of fetchall() results, in the order given
+    """
+    con = get_spending_connection()
+    
+    def run(query):
+        cur = con.cursor()
+        try:
+            return cur.execute(query).fetchall()
+        finally:
+            cur.close()
+    
+    with ThreadPoolExecutor(max_workers=len(queries)) as pool:
+        return list(pool.map(run, queries))
 
 
 # S3 bucket base URL (public, no credentials needed)
 S3_HTTPS_BASE = "https://nyc-databook-spending.s3.amazonaws.com"
 
+# Same bucket via the s3:// scheme, which (unlike HTTPS) supports globbing
+S3_BUCKET = "s3://nyc-databook-spending"
+
 # Fiscal years available in the spending data
 SPENDING_FISCAL_YEARS = list(range(2010, 2026))  # FY2010-FY2025
 
+# check_amount is stored as text in the parquet chunks; cast it once here so
+# queries over v_spending can aggregate it directly
+SPENDING_COLUMNS = "* REPLACE (TRY_CAST(check_amount AS DOUBLE) AS check_amount)"
 
+# Errors a scan raises when a parquet chunk's schema differs from the first one read
+SPENDING_SCHEMA_ERRORS = (
+    duckdb.BinderException,
+    duckdb.ConversionException,
+    duckdb.TypeMismatchException,
+)
+
+# Years searched when a tool isn't given a fiscal year (kept small for performance)
+RECENT_FISCAL_YEARS = (2024, 2023, 2022)
+
+
+def is_schema_drift(error) -> bool:
+    """
+    Whether a failed spending scan is down to chunks with differing schemas.
+    
+    InvalidInputException also covers unreadable or truncated files, so it
+    only counts when DuckDB reports a schema mismatch in the glob. Network
+    and S3 errors (IOException, HTTPException) never count: retrying them
+    with union_by_name would only repeat the failure more slowly.
+    """
+    if isinstance(error, SPENDING_SCHEMA_ERRORS):
+        return True
+    return isinstance(error, duckdb.InvalidInputException) and "schema mismatch" in str(error)
+
+
+@functools.lru_cache(maxsize=None)
 def get_spending_files(fiscal_year: int = None) -> str:
     """
-    Generate a list of parquet file URLs for spending data.
+    Generate a hive-partitioned glob of parquet files for spending data.
+    
+    Read it with hive_partitioning=true. Without a fiscal year the glob spans
+    every fiscal_year=* directory, so filter on fiscal_year in the query to
+    let DuckDB prune whole partitions before opening any files.
     
     Args:
-        fiscal_year: Specific year, or None for recent years
+        fiscal_year: Specific year, or None for all years
         
     Returns:
-        SQL-ready list of file URLs
+        SQL-ready quoted glob
     """
-    # Known chunk counts per fiscal year (based on actual S3 contents)
-    CHUNKS_PER_YEAR = {
-        2024: 17, 2023: 18, 2022: 17, 2021: 15, 2020: 14,
-        2019: 13, 2018: 12, 2017: 11, 2016: 10, 2015: 10,
-        2014: 9, 2013: 9, 2012: 8, 2011: 7, 2010: 6
-    }
-    
-    if fiscal_year:
-        years = [fiscal_year]
-    else:
-        # Default to recent 3 years for performance
-        years = [2024, 2023, 2022]
+    partition = fiscal_year if fiscal_year else "*"
+    return f"'{S3_BUCKET}/fiscal_year={partition}/chunk_*.parquet'"
+
+
+def fiscal_year_filter(years) -> str:
+    """
+    SQL predicate restricting a spending scan to the given fiscal years.
     
-    urls = []
-    for fy in years:
-        chunks = CHUNKS_PER_YEAR.get(fy, 10)  # Default to 10 if unknown
-        for chunk in range(1, chunks + 1):
-            url = f"{S3_HTTPS_BASE}/fiscal_year={fy}/chunk_{chunk:04d}.parquet"
-            urls.append(f"'{url}'")
-    return "[" + ", ".join(urls) + "]"
+    Filters on the fiscal_year hive partition only, so DuckDB prunes the other
+    years' files. Checkbook files payments and adjustments (e.g. year-end
+    accruals) under a fiscal year even when issue_date falls outside its July 1 -
+    June 30 span, so the date is deliberately not used to narrow the scan.
+    """
+    return f"fiscal_year IN ({', '.join(map(str, sorted(years)))})"
 
 
+@functools.lru_cache(maxsize=None)
 def get_contracts_files(fiscal_year: int = None) -> str:
     """Generate parquet file URLs for contract data."""
     if fiscal_year:
@@ -109,6 +363,105 @@ def get_contracts_files(fiscal_year: int = None) -> str:
     return "[" + ", ".join(urls) + "]"
 
 
+@functools.lru_cache(maxsize=32)
+def count_csv_records(path: str, mtime: float, size: int) -> int:
+    """
+    Count data rows (lines minus the header) in a CSV file.
+    
+    This counts physical lines, so a quoted field with embedded newlines
+    (common in the description columns) adds one per extra line; it's an
+    upper bound on the true record count, like the line count it replaced.
+    
+    mtime and size are only part of the cache key, so a regenerated file
+    is recounted.
+    """
+    lines = 0
+    last = b"\n"
+    with open(path, "rb", buffering=0) as f:
+        while chunk := f.read(1 << 20):
+            lines += chunk.count(b"\n")
+            last = chunk[-1:]
+    # A final line without a trailing newline is still a line
+    if last != b"\n":
+        lines += 1
+    return lines - 1
+
+
+# Cached tool responses. SQLite-backed tools are keyed on db_stamp() too, so
+# they stay valid until the database changes; S3-backed tools expire.
+TOOL_CACHE_SIZE = 256
+S3_TOOL_CACHE_SIZE = 128
+S3_TOOL_CACHE_TTL = 3600  # seconds
+
+
+def memoize_tool(cache):
+    """
+    Cache a tool's response per set of arguments in the given cache.
+    
+    Error responses aren't cached, so a transient S3/DB failure is retried
+    on the next call.
+    """
+    lock = threading.Lock()
+    
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            try:
+                stamp = db_stamp()
+            except OSError:
+                stamp = None
+            key = hashkey(stamp, *args, **kwargs)
+            
+            with lock:
+                result = cache.get(key)
+            if result is not None:
+                return result
+            
+            result = func(*args, **kwargs)
+            if not result.startswith("Error"):
+                with lock:
+                    cache[key] = result
+            return result
+        return wrapper
+    return decorator
+
+
+def like_filter(table: str, columns: tuple, text: str):
+    """
+    Build a WHERE condition matching text as a substring of any of the columns.
+    
+    Uses the table's trigram FTS5 index (see build_database.create_search_indexes)
+    when the database has one, and a plain LIKE scan otherwise.
+    
+    Returns:
+        (condition, params) tuple
+    """
+    pattern = f"%{text}%"
+    params = [pattern] * len(columns)
+    has_fts = cached_query_db(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+        (f"{table}_fts",),
+        one=True
+    )
+    if has_fts:
+        lookups = " UNION ".join(f"SELECT rowid FROM {table}_fts WHERE {col} LIKE ?" for col in columns)
+        return f"rowid IN ({lookups})", params
+    return "(" + " OR ".join(f"{col} LIKE ?" for col in columns) + ")", params
+
+
+# Row templates for list-style tool output, filled with str.format_map
+_VENDOR_ROW_TMPL = "- **{name}** (ID: {passport_supplier_id})\n  - Certification: {cert} | Category: {category}"
+_CONTRACT_ROW_TMPL = (
+    "- **{contract_id}**: {title}...\n"
+    "  - Vendor: {vendor_name}\n"
+    "  - Agency: {agency}\n"
+    "  - Amount: {amount} | Status: {status}"
+)
+_SOLICITATION_ROW_TMPL = "- **{epin}**: {name}...\n  - Agency: {agency}\n  - Status: {status} | Due: {due_date}"
+_AGENCY_VENDOR_ROW_TMPL = "- {vendor_name}: {count} contracts ({total})\n"
+_AGENCY_CONTRACT_ROW_TMPL = "- **{contract_id}**: {title}...\n  Vendor: {vendor_name} | {amount}\n"
+
+
 def format_currency(amount) -> str:
     """Format a number as currency."""
     if amount is None:
@@ -119,11 +472,22 @@ def format_currency(amount) -> str:
         return "N/A"
 
 
+def format_currencies(amounts) -> list:
+    """Format a column of amounts as currency in one pass (see format_currency)."""
+    return [
+        "N/A" if a is None
+        else f"${a:,.2f}" if isinstance(a, (int, float))
+        else format_currency(a)
+        for a in amounts
+    ]
+
+
 # ============================================================================
 # Vendor Tools
 # ============================================================================
 
 @mcp.tool()
+@memoize_tool(LRUCache(maxsize=TOOL_CACHE_SIZE))
 def search_vendors(query: str, limit: int = 20) -> str:
     """
     Search NYC vendors by name.
@@ -137,32 +501,37 @@ def search_vendors(query: str, limit: int = 20) -> str:
     """
     limit = min(limit, 100)
     
+    name_match, params = like_filter("vendors", ("name",), query)
     rows = query_db(
-        """
+        f"""
         SELECT passport_supplier_id, name, certification_type, ethnicity, business_category
         FROM vendors 
-        WHERE name LIKE ? 
+        WHERE {name_match} 
         ORDER BY name 
         LIMIT ?
         """,
-        (f"%{query}%", limit)
+        tuple(params) + (limit,)
     )
     
     if not rows:
         return f"No vendors found matching '{query}'"
     
     results = [f"**Found {len(rows)} vendor(s) matching '{query}':**\n"]
-    for row in rows:
-        cert = row['certification_type'] or 'None'
-        results.append(
-            f"- **{row['name']}** (ID: {row['passport_supplier_id']})\n"
-            f"  - Certification: {cert} | Category: {row['business_category'] or 'N/A'}"
-        )
+    results += [
+        _VENDOR_ROW_TMPL.format_map({
+            'name': row['name'],
+            'passport_supplier_id': row['passport_supplier_id'],
+            'cert': row['certification_type'] or 'None',
+            'category': row['business_category'] or 'N/A',
+        })
+        for row in rows
+    ]
     
     return "\n".join(results)
 
 
 @mcp.tool()
+@memoize_tool(LRUCache(maxsize=TOOL_CACHE_SIZE))
 def get_vendor_profile(vendor_id: str) -> str:
     """
     Get detailed profile for a specific vendor.
@@ -183,12 +552,26 @@ def get_vendor_profile(vendor_id: str) -> str:
         return f"Vendor with ID '{vendor_id}' not found"
     
     # Get contract stats
-    contracts = query_db(
-        "SELECT * FROM contracts WHERE vendor_name = ?",
-        (vendor['name'],)
+    stats = query_db(
+        """
+        SELECT COUNT(*) as contract_count, COALESCE(SUM(award_amount), 0) as total_awarded
+        FROM contracts
+        WHERE vendor_name = ?
+        """,
+        (vendor['name'],),
+        one=True
     )
     
-    total_awarded = sum(c['award_amount'] for c in contracts if c['award_amount'])
+    recent = query_db(
+        """
+        SELECT contract_id, contract_title, award_amount
+        FROM contracts
+        WHERE vendor_name = ?
+        ORDER BY start_date DESC
+        LIMIT 5
+        """,
+        (vendor['name'],)
+    )
     
     profile = f"""
 **{vendor['name']}**
@@ -201,14 +584,14 @@ def get_vendor_profile(vendor_id: str) -> str:
 - Website: {vendor['website_url'] or 'N/A'}
 
 **Contract Statistics:**
-- Total Contracts: {len(contracts)}
-- Total Awarded: {format_currency(total_awarded)}
+- Total Contracts: {stats['contract_count']}
+- Total Awarded: {format_currency(stats['total_awarded'])}
 """
     
     # Recent contracts
-    if contracts:
+    if recent:
         profile += "\n**Recent Contracts:**\n"
-        for c in sorted(contracts, key=lambda x: x['start_date'] or '', reverse=True)[:5]:
+        for c in recent:
             profile += f"- {c['contract_id']}: {c['contract_title'][:50]}... ({format_currency(c['award_amount'])})\n"
     
     return profile.strip()
@@ -244,17 +627,13 @@ def search_contracts(
     where_clauses = []
     params = []
     
-    if query:
-        where_clauses.append("(contract_id LIKE ? OR contract_title LIKE ?)")
-        params.extend([f"%{query}%", f"%{query}%"])
-    
-    if vendor:
-        where_clauses.append("vendor_name LIKE ?")
-        params.append(f"%{vendor}%")
-    
-    if agency:
-        where_clauses.append("agency LIKE ?")
-        params.append(f"%{agency}%")
+    for text, columns in ((query, ("contract_id", "contract_title")),
+                          (vendor, ("vendor_name",)),
+                          (agency, ("agency",))):
+        if text:
+            clause, clause_params = like_filter("contracts", columns, text)
+            where_clauses.append(clause)
+            params.extend(clause_params)
     
     if status:
         where_clauses.append("status = ?")
@@ -278,19 +657,24 @@ def search_contracts(
         return "No contracts found matching the criteria"
     
     results = [f"**Found {len(rows)} contract(s):**\n"]
-    for row in rows:
-        title = (row['contract_title'] or 'Untitled')[:50]
-        results.append(
-            f"- **{row['contract_id']}**: {title}...\n"
-            f"  - Vendor: {row['vendor_name']}\n"
-            f"  - Agency: {row['agency'] or 'N/A'}\n"
-            f"  - Amount: {format_currency(row['award_amount'])} | Status: {row['status'] or 'N/A'}"
-        )
+    amounts = format_currencies([row['award_amount'] for row in rows])
+    results += [
+        _CONTRACT_ROW_TMPL.format_map({
+            'contract_id': row['contract_id'],
+            'title': (row['contract_title'] or 'Untitled')[:50],
+            'vendor_name': row['vendor_name'],
+            'agency': row['agency'] or 'N/A',
+            'amount': amount,
+            'status': row['status'] or 'N/A',
+        })
+        for row, amount in zip(rows, amounts)
+    ]
     
     return "\n".join(results)
 
 
 @mcp.tool()
+@memoize_tool(LRUCache(maxsize=TOOL_CACHE_SIZE))
 def get_contract_details(contract_id: str) -> str:
     """
     Get detailed information for a specific contract.
@@ -301,9 +685,15 @@ def get_contract_details(contract_id: str) -> str:
     Returns:
         Full contract details including linked solicitation
     """
+    # Two indexed lookups instead of an OR, which SQLite can't seek on;
+    # contract_id is the common case so it goes first.
     contract = query_db(
-        "SELECT * FROM contracts WHERE ctr_id = ? OR contract_id = ?",
-        (contract_id, contract_id),
+        "SELECT * FROM contracts WHERE contract_id = ? LIMIT 1",
+        (contract_id,),
+        one=True
+    ) or query_db(
+        "SELECT * FROM contracts WHERE ctr_id = ? LIMIT 1",
+        (contract_id,),
         one=True
     )
     
@@ -334,7 +724,7 @@ def get_contract_details(contract_id: str) -> str:
 """
     
     # Check for linked solicitation
-    if contract.get('normalized_epin'):
+    if contract['normalized_epin']:
         solicitation = query_db(
             "SELECT * FROM solicitations WHERE normalized_epin = ?",
             (contract['normalized_epin'],),
@@ -381,29 +771,19 @@ def get_contract_stats(
     
     where_str = "WHERE " + " AND ".join(where_clauses) if where_clauses else ""
     
-    # Get aggregate stats
-    stats = query_db(
-        f"""
-        SELECT 
-            COUNT(*) as contract_count,
-            SUM(award_amount) as total_amount,
-            AVG(award_amount) as avg_amount,
-            MIN(award_amount) as min_amount,
-            MAX(award_amount) as max_amount
-        FROM contracts
-        {where_str}
-        """,
-        tuple(params),
-        one=True
-    )
-    
-    if not stats or stats['contract_count'] == 0:
-        return f"No contracts found for the specified criteria"
-    
-    # Get breakdown by status
+    # Breakdown by status; the window columns carry the overall totals so the
+    # filtered set is only scanned once for both.
     status_breakdown = query_db(
         f"""
-        SELECT status, COUNT(*) as count, SUM(award_amount) as total
+        SELECT 
+            status,
+            COUNT(*) as count,
+            SUM(award_amount) as total,
+            SUM(COUNT(*)) OVER () as contract_count,
+            SUM(SUM(award_amount)) OVER () as total_amount,
+            SUM(COUNT(award_amount)) OVER () as amount_count,
+            MIN(MIN(award_amount)) OVER () as min_amount,
+            MAX(MAX(award_amount)) OVER () as max_amount
         FROM contracts
         {where_str}
         GROUP BY status
@@ -412,24 +792,36 @@ def get_contract_stats(
         tuple(params)
     )
     
+    if not status_breakdown:
+        return f"No contracts found for the specified criteria"
+    
+    stats = status_breakdown[0]
+    avg_amount = stats['total_amount'] / stats['amount_count'] if stats['amount_count'] else None
+    
     # Get top agencies if no agency filter
     agency_info = ""
     if not agency:
-        top_agencies = query_db(
-            f"""
-            SELECT agency, COUNT(*) as count, SUM(award_amount) as total
-            FROM contracts
-            {where_str}
-            GROUP BY agency
-            ORDER BY count DESC
-            LIMIT 10
-            """,
-            tuple(params)
-        )
+        if not where_str:
+            top_agencies = contract_counts('agency', 10)
+        else:
+            top_agencies = query_db(
+                f"""
+                SELECT agency, COUNT(*) as count, SUM(award_amount) as total
+                FROM contracts
+                {where_str}
+                GROUP BY agency
+                ORDER BY count DESC
+                LIMIT 10
+                """,
+                tuple(params)
+            )
         if top_agencies:
             agency_info = "\n**Top Agencies by Contract Count:**\n"
-            for a in top_agencies:
-                agency_info += f"- {a['agency'] or 'Unknown'}: {a['count']} contracts ({format_currency(a['total'])})\n"
+            totals = format_currencies([a['total'] for a in top_agencies])
+            agency_info += "".join([
+                f"- {a['agency'] or 'Unknown'}: {a['count']} contracts ({total})\n"
+                for a, total in zip(top_agencies, totals)
+            ])
     
     title_parts = []
     if agency:
@@ -443,14 +835,17 @@ def get_contract_stats(
 **Summary:**
 - Total Contracts: **{stats['contract_count']:,}**
 - Total Award Amount: **{format_currency(stats['total_amount'])}**
-- Average Award: {format_currency(stats['avg_amount'])}
+- Average Award: {format_currency(avg_amount)}
 - Range: {format_currency(stats['min_amount'])} - {format_currency(stats['max_amount'])}
 
 **By Status:**
 """
     
-    for s in status_breakdown:
-        result += f"- {s['status'] or 'Unknown'}: {s['count']} contracts ({format_currency(s['total'])})\n"
+    totals = format_currencies([s['total'] for s in status_breakdown])
+    result += "".join([
+        f"- {s['status'] or 'Unknown'}: {s['count']} contracts ({total})\n"
+        for s, total in zip(status_breakdown, totals)
+    ])
     
     result += agency_info
     
@@ -473,23 +868,34 @@ def get_agency_contracts(agency: str, limit: int = 10) -> str:
     """
     limit = min(limit, 50)
     
-    # Get aggregate stats for the agency
-    stats = query_db(
+    # Get top vendors for this agency; the window columns carry the agency-wide
+    # totals so the summary comes from the same scan.
+    top_vendors = query_db(
         """
         SELECT 
-            COUNT(*) as contract_count,
-            SUM(award_amount) as total_amount,
-            COUNT(DISTINCT vendor_name) as unique_vendors
-        FROM contracts
-        WHERE agency LIKE ?
+            vendor_name,
+            count,
+            total,
+            SUM(count) OVER () as contract_count,
+            SUM(total) OVER () as total_amount,
+            COUNT(vendor_name) OVER () as unique_vendors
+        FROM (
+            SELECT vendor_name, COUNT(*) as count, SUM(award_amount) as total
+            FROM contracts
+            WHERE agency LIKE ?
+            GROUP BY vendor_name
+        )
+        ORDER BY total DESC
+        LIMIT 5
         """,
-        (f"%{agency}%",),
-        one=True
+        (f"%{agency}%",)
     )
     
-    if not stats or stats['contract_count'] == 0:
+    if not top_vendors:
         return f"No contracts found for agency matching '{agency}'"
     
+    stats = top_vendors[0]
+    
     # Get recent contracts
     recent = query_db(
         """
@@ -502,19 +908,6 @@ def get_agency_contracts(agency: str, limit: int = 10) -> str:
         (f"%{agency}%", limit)
     )
     
-    # Get top vendors for this agency
-    top_vendors = query_db(
-        """
-        SELECT vendor_name, COUNT(*) as count, SUM(award_amount) as total
-        FROM contracts
-        WHERE agency LIKE ?
-        GROUP BY vendor_name
-        ORDER BY total DESC
-        LIMIT 5
-        """,
-        (f"%{agency}%",)
-    )
-    
     result = f"""**Agency Contracts: {agency}**
 
 **Summary:**
@@ -525,14 +918,27 @@ def get_agency_contracts(agency: str, limit: int = 10) -> str:
 **Top Vendors by Award Amount:**
 """
     
-    for v in top_vendors:
-        result += f"- {v['vendor_name']}: {v['count']} contracts ({format_currency(v['total'])})\n"
+    totals = format_currencies([v['total'] for v in top_vendors])
+    result += "".join([
+        _AGENCY_VENDOR_ROW_TMPL.format_map({
+            'vendor_name': v['vendor_name'],
+            'count': v['count'],
+            'total': total,
+        })
+        for v, total in zip(top_vendors, totals)
+    ])
     
     result += f"\n**Recent Contracts ({limit} shown):**\n"
-    for row in recent:
-        title = (row['contract_title'] or 'Untitled')[:40]
-        result += f"- **{row['contract_id']}**: {title}...\n"
-        result += f"  Vendor: {row['vendor_name']} | {format_currency(row['award_amount'])}\n"
+    amounts = format_currencies([row['award_amount'] for row in recent])
+    result += "".join([
+        _AGENCY_CONTRACT_ROW_TMPL.format_map({
+            'contract_id': row['contract_id'],
+            'title': (row['contract_title'] or 'Untitled')[:40],
+            'vendor_name': row['vendor_name'],
+            'amount': amount,
+        })
+        for row, amount in zip(recent, amounts)
+    ])
     
     return result.strip()
 
@@ -566,16 +972,18 @@ def search_solicitations(
     params = []
     
     if query:
-        where_clauses.append("(epin LIKE ? OR procurement_name LIKE ?)")
-        params.extend([f"%{query}%", f"%{query}%"])
+        clause, clause_params = like_filter("solicitations", ("epin", "procurement_name"), query)
+        where_clauses.append(clause)
+        params.extend(clause_params)
     
     if status:
         where_clauses.append("rfx_status = ?")
         params.append(status)
     
     if agency:
-        where_clauses.append("agency LIKE ?")
-        params.append(f"%{agency}%")
+        clause, clause_params = like_filter("solicitations", ("agency",), agency)
+        where_clauses.append(clause)
+        params.extend(clause_params)
     
     where_str = "WHERE " + " AND ".join(where_clauses) if where_clauses else ""
     
@@ -595,18 +1003,22 @@ def search_solicitations(
         return "No solicitations found matching the criteria"
     
     results = [f"**Found {len(rows)} solicitation(s):**\n"]
-    for row in rows:
-        name = (row['procurement_name'] or 'Untitled')[:50]
-        results.append(
-            f"- **{row['epin']}**: {name}...\n"
-            f"  - Agency: {row['agency'] or 'N/A'}\n"
-            f"  - Status: {row['rfx_status'] or 'N/A'} | Due: {row['due_date'] or 'N/A'}"
-        )
+    results += [
+        _SOLICITATION_ROW_TMPL.format_map({
+            'epin': row['epin'],
+            'name': (row['procurement_name'] or 'Untitled')[:50],
+            'agency': row['agency'] or 'N/A',
+            'status': row['rfx_status'] or 'N/A',
+            'due_date': row['due_date'] or 'N/A',
+        })
+        for row in rows
+    ]
     
     return "\n".join(results)
 
 
 @mcp.tool()
+@memoize_tool(LRUCache(maxsize=TOOL_CACHE_SIZE))
 def get_solicitation_details(epin: str) -> str:
     """
     Get detailed information for a specific solicitation.
@@ -644,18 +1056,27 @@ def get_solicitation_details(epin: str) -> str:
 """
     
     # Find resulting contracts
-    contracts = query_db(
-        "SELECT * FROM contracts WHERE normalized_epin LIKE ?",
-        (solicitation['normalized_epin'] + '%',)
+    epin_prefix = solicitation['normalized_epin'] + '%'
+    stats = query_db(
+        """
+        SELECT COUNT(*) as contract_count, COALESCE(SUM(award_amount), 0) as total_awarded
+        FROM contracts
+        WHERE normalized_epin LIKE ?
+        """,
+        (epin_prefix,),
+        one=True
     )
     
-    if contracts:
-        total = sum(c['award_amount'] for c in contracts if c['award_amount'])
+    if stats['contract_count']:
+        contracts = query_db(
+            "SELECT contract_id, vendor_name, award_amount FROM contracts WHERE normalized_epin LIKE ? LIMIT 5",
+            (epin_prefix,)
+        )
         details += f"""
-**Resulting Contracts:** {len(contracts)}
-- Total Awarded: {format_currency(total)}
+**Resulting Contracts:** {stats['contract_count']}
+- Total Awarded: {format_currency(stats['total_awarded'])}
 """
-        for c in contracts[:5]:
+        for c in contracts:
             details += f"- {c['contract_id']}: {c['vendor_name']} ({format_currency(c['award_amount'])})\n"
     
     return details.strip()
@@ -685,45 +1106,71 @@ def search_transactions(
     limit = min(limit, 200)
     
     try:
-        con = get_spending_connection()
+        cur = get_spending_connection().cursor()
         
-        safe_q = query.replace("'", "''")
+        pattern = f"%{query}%"
         
-        files = get_spending_files()  # Recent 5 years
-        
-        result = con.execute(f"""
+        # Match count and total ride along as window columns, so only the
+        # rows actually displayed are fetched into Python.
+        sql = """
             SELECT 
-                issue_date,
-                agency,
-                payee_name,
-                contract_id,
-                expense_category,
-                TRY_CAST(check_amount AS DOUBLE) as check_amount
-            FROM read_parquet({files}, union_by_name=true)
-            WHERE payee_name ILIKE '%{safe_q}%' 
-               OR agency ILIKE '%{safe_q}%'
-               OR contract_id ILIKE '%{safe_q}%'
+                *,
+                COUNT(*) OVER () as match_count,
+                COALESCE(SUM(check_amount) OVER (), 0) as match_total
+            FROM (
+                SELECT 
+                    issue_date,
+                    agency,
+                    payee_name,
+                    contract_id,
+                    expense_category,
+                    check_amount
+                FROM {source}
+                WHERE {year_filter}
+                  AND (payee_name ILIKE ? 
+                       OR agency ILIKE ?
+                       OR contract_id ILIKE ?)
+                ORDER BY issue_date DESC
+                LIMIT ?
+            )
             ORDER BY issue_date DESC
-            LIMIT {limit}
-        """).fetchall()
+        """
+        year_filter = fiscal_year_filter(RECENT_FISCAL_YEARS)
+        params = [pattern, pattern, pattern, limit]
         
-        con.close()
+        # The chunks share one schema, so v_spending skips union_by_name (which
+        # reads every footer to align columns); only fall back to it if they drift.
+        try:
+            try:
+                cur.execute(sql.format(source="v_spending", year_filter=year_filter), params)
+            except duckdb.Error as e:
+                if not is_schema_drift(e):
+                    raise
+                source = (
+                    f"(SELECT {SPENDING_COLUMNS} FROM read_parquet("
+                    f"{get_spending_files()}, hive_partitioning=true, union_by_name=true))"
+                )
+                cur.execute(sql.format(source=source, year_filter=year_filter), params)
+            result = cur.fetchmany(20)  # Show first 20 in detail
+        finally:
+            cur.close()
         
         if not result:
             return f"No transactions found matching '{query}'"
         
-        output = [f"**Found {len(result)} transaction(s) matching '{query}':**\n"]
-        total = sum(r[5] or 0 for r in result)
+        match_count, total = result[0][6], result[0][7]
+        output = [f"**Found {match_count} transaction(s) matching '{query}':**\n"]
         output.append(f"*Total shown: {format_currency(total)}*\n")
         
-        for r in result[:20]:  # Show first 20 in detail
-            output.append(
-                f"- **{r[0]}**: {r[2]} ({r[1]})\n"
-                f"  - Amount: {format_currency(r[5])} | Contract: {r[3] or 'N/A'}"
-            )
+        amounts = format_currencies([r[5] for r in result])
+        output += [
+            f"- **{r[0]}**: {r[2]} ({r[1]})\n"
+            f"  - Amount: {amount} | Contract: {r[3] or 'N/A'}"
+            for r, amount in zip(result, amounts)
+        ]
         
-        if len(result) > 20:
-            output.append(f"\n*... and {len(result) - 20} more transactions*")
+        if match_count > 20:
+            output.append(f"\n*... and {match_count - 20} more transactions*")
         
         return "\n".join(output)
         
@@ -744,51 +1191,45 @@ def get_vendor_spending(vendor_name: str, fiscal_year: Optional[int] = None) ->
         Spending summary and recent transactions
     """
     try:
-        con = get_spending_connection()
-        
-        safe_name = vendor_name.replace("'", "''")
+        cur = get_spending_connection().cursor()
         
-        files = get_spending_files(fiscal_year)
+        breakdown_years = range(2024, 2019, -1)  # Last 5 years
+        years = set(breakdown_years)
+        if fiscal_year:
+            years.add(fiscal_year)
         
-        # Get summary
-        summary = con.execute(f"""
+        # One scan grouped by the fiscal_year partition; the ROLLUP row
+        # (fy IS NULL) is the total across all scanned years.
+        rows = cur.execute(f"""
             SELECT 
+                fiscal_year as fy,
                 COUNT(*) as tx_count,
-                SUM(TRY_CAST(check_amount AS DOUBLE)) as total,
+                SUM(check_amount) as total,
                 MIN(issue_date) as first_tx,
                 MAX(issue_date) as last_tx
-            FROM read_parquet({files}, union_by_name=true)
-            WHERE payee_name ILIKE '%{safe_name}%'
-        """).fetchone()
+            FROM v_spending
+            WHERE {fiscal_year_filter(years)}
+              AND payee_name ILIKE ?
+            GROUP BY ROLLUP(fy)
+        """, [f"%{vendor_name}%"]).fetchall()
         
-        # Get by fiscal year (query each year separately for accurate breakdown)
-        by_year = []
-        for fy in range(2024, 2019, -1):  # Last 5 years
-            try:
-                fy_files = get_spending_files(fy)
-                fy_total = con.execute(f"""
-                    SELECT SUM(TRY_CAST(check_amount AS DOUBLE)) as total
-                    FROM read_parquet({fy_files}, union_by_name=true)
-                    WHERE payee_name ILIKE '%{safe_name}%'
-                """).fetchone()
-                if fy_total and fy_total[0]:
-                    by_year.append((fy, fy_total[0]))
-            except:
-                pass
+        cur.close()
         
-        con.close()
+        by_fy = {row[0]: row for row in rows}
+        summary = by_fy.get(fiscal_year)  # fiscal_year=None picks the ROLLUP row
+        by_year = [(fy, by_fy[fy][2]) for fy in breakdown_years if fy in by_fy and by_fy[fy][2]]
         
-        if not summary or summary[0] == 0:
+        if not summary or summary[1] == 0:
             return f"No spending found for vendor '{vendor_name}'"
         
         output = f"""
 **Spending Summary for '{vendor_name}'**
 {f'(Fiscal Year {fiscal_year})' if fiscal_year else '(All Time)'}
 
-- Total Transactions: {summary[0]:,}
-- Total Amount: {format_currency(summary[1])}
-- First Transaction: {summary[2]}
-- Last Transaction: {summary[3]}
+- Total Transactions: {summary[1]:,}
+- Total Amount: {format_currency(summary[2])}
+- First Transaction: {summary[3]}
+- Last Transaction: {summary[4]}
 
 **By Fiscal Year:**
 """
@@ -802,6 +1243,7 @@ def get_vendor_spending(vendor_name: str, fiscal_year: Optional[int] = None) ->
 
 
 @mcp.tool()
+@memoize_tool(TTLCache(maxsize=S3_TOOL_CACHE_SIZE, ttl=S3_TOOL_CACHE_TTL))
 def get_spending_by_year(fiscal_year: int) -> str:
     """
     Get aggregate spending statistics for a fiscal year.
@@ -813,30 +1255,35 @@ def get_spending_by_year(fiscal_year: int) -> str:
         Spending breakdown by agency and category
     """
     try:
-        con = get_spending_connection()
-        
-        files = get_spending_files(fiscal_year)
+        fiscal_year = int(fiscal_year)
         
-        # Overall stats
-        stats = con.execute(f"""
+        # Project only the columns needed so DuckDB fetches just those column
+        # chunks, from the one fiscal_year partition. The overall stats and the
+        # top agencies are scanned in parallel.
+        stats_rows, by_agency = run_spending_queries(
+            # Overall stats
+            f"""
             SELECT 
                 COUNT(*) as tx_count,
-                SUM(TRY_CAST(check_amount AS DOUBLE)) as total
-            FROM read_parquet({files}, union_by_name=true)
-        """).fetchone()
-        
-        # Top agencies
-        by_agency = con.execute(f"""
+                SUM(check_amount) as total
+            FROM (SELECT check_amount FROM v_spending WHERE fiscal_year = {fiscal_year})
+            """,
+            # Top agencies
+            f"""
             SELECT 
                 agency,
-                SUM(TRY_CAST(check_amount AS DOUBLE)) as total
-            FROM read_parquet({files}, union_by_name=true)
+                SUM(amount) as total
+            FROM (
+                SELECT agency, check_amount as amount
+                FROM v_spending
+                WHERE fiscal_year = {fiscal_year}
+            )
             GROUP BY agency
             ORDER BY total DESC
             LIMIT 10
-        """).fetchall()
-        
-        con.close()
+            """
+        )
+        stats = stats_rows[0] if stats_rows else None
         
         if not stats or stats[0] == 0:
             return f"No spending data found for fiscal year {fiscal_year}"
@@ -849,8 +1296,11 @@ def get_spending_by_year(fiscal_year: int) -> str:
 
 **Top 10 Agencies by Spending:**
 """
-        for i, row in enumerate(by_agency, 1):
-            output += f"{i}. {row[0]}: {format_currency(row[1])}\n"
+        totals = format_currencies([row[1] for row in by_agency])
+        output += "".join([
+            f"{i}. {row[0]}: {total}\n"
+            for i, (row, total) in enumerate(zip(by_agency, totals), 1)
+        ])
         
         return output.strip()
         
@@ -859,6 +1309,7 @@ def get_spending_by_year(fiscal_year: int) -> str:
 
 
 @mcp.tool()
+@memoize_tool(TTLCache(maxsize=S3_TOOL_CACHE_SIZE, ttl=S3_TOOL_CACHE_TTL))
 def get_datasets_info() -> str:
     """
     Get information about available datasets and their freshness.
@@ -884,13 +1335,13 @@ def get_datasets_info() -> str:
     for label, filename in csv_files:
         filepath = os.path.join(base_dir, filename)
         if os.path.exists(filepath):
-            mtime = datetime.fromtimestamp(os.path.getmtime(filepath))
+            stat = os.stat(filepath)
+            mtime = datetime.fromtimestamp(stat.st_mtime)
             try:
-                with open(filepath, 'rb') as f:
-                    count = sum(1 for _ in f) - 1
-            except:
+                count = f"{count_csv_records(filepath, stat.st_mtime, stat.st_size):,}"
+            except OSError:
                 count = "Unknown"
-            datasets.append(f"- **{label}**: {count:,} records (updated {mtime.strftime('%Y-%m-%d')})")
+            datasets.append(f"- **{label}**: {count} records (updated {mtime.strftime('%Y-%m-%d')})")
         else:
             datasets.append(f"- **{label}**: Not found locally")
     
@@ -919,6 +1370,7 @@ def get_datasets_info() -> str:
 # ============================================================================
 
 @mcp.tool()
+@memoize_tool(LRUCache(maxsize=TOOL_CACHE_SIZE))
 def get_database_overview() -> str:
     """
     Get a complete overview of all NYC procurement data available.
@@ -928,41 +1380,27 @@ def get_database_overview() -> str:
     Returns:
         Summary counts and statistics for all data tables
     """
-    # Get counts for each table
-    vendors_count = query_db("SELECT COUNT(*) as c FROM vendors", one=True)['c']
-    contracts_count = query_db("SELECT COUNT(*) as c FROM contracts", one=True)['c']
-    solicitations_count = query_db("SELECT COUNT(*) as c FROM solicitations", one=True)['c']
-    agencies_count = query_db("SELECT COUNT(*) as c FROM agencies", one=True)['c']
-    
-    # Contract stats
-    contract_stats = query_db("""
-        SELECT 
-            SUM(award_amount) as total_value,
-            AVG(award_amount) as avg_value,
-            COUNT(DISTINCT agency) as agency_count,
-            COUNT(DISTINCT vendor_name) as vendor_count
-        FROM contracts
-    """, one=True)
+    # Table counts, contract stats and the two status breakdowns, each
+    # tagged so the rows can be dispatched below
+    rows = stats_rows('overview')
     
-    # Status breakdown
-    contract_status = query_db("""
-        SELECT status, COUNT(*) as count 
-        FROM contracts 
-        GROUP BY status 
-        ORDER BY count DESC 
-        LIMIT 5
-    """)
+    totals = {}
+    breakdowns = {'contract_status': [], 'sol_status': []}
+    for row in rows:
+        if row['tag'] in breakdowns:
+            breakdowns[row['tag']].append(row)
+        else:
+            totals[row['tag']] = row
     
-    # Solicitation status
-    sol_status = query_db("""
-        SELECT rfx_status, COUNT(*) as count 
-        FROM solicitations 
-        GROUP BY rfx_status 
-        ORDER BY count DESC 
-        LIMIT 5
-    """)
+    vendors_count = totals['vendors']['count']
+    contracts_count = totals['contracts']['count']
+    solicitations_count = totals['solicitations']['count']
+    agencies_count = totals['agencies']['count']
+    contract_stats = totals['contracts']
+    contract_status = breakdowns['contract_status']
+    sol_status = breakdowns['sol_status']
     
-    result = f"""**NYC Procurement Database Overview**
+    lines = [f"""**NYC Procurement Database Overview**
 
 **Total Records:**
 - Vendors: **{vendors_count:,}**
@@ -976,29 +1414,26 @@ def get_database_overview() -> str:
 - Unique Agencies: {contract_stats['agency_count']}
 - Unique Vendors: {contract_stats['vendor_count']}
 
-**Contract Status Breakdown:**
-"""
-    for s in contract_status:
-        result += f"- {s['status'] or 'Unknown'}: {s['count']:,}\n"
+**Contract Status Breakdown:**"""]
+    lines.extend(f"- {s['label'] or 'Unknown'}: {s['count']:,}" for s in contract_status)
     
-    result += "\n**Solicitation Status Breakdown:**\n"
-    for s in sol_status:
-        result += f"- {s['rfx_status'] or 'Unknown'}: {s['count']:,}\n"
+    lines.append("\n**Solicitation Status Breakdown:**")
+    lines.extend(f"- {s['label'] or 'Unknown'}: {s['count']:,}" for s in sol_status)
     
-    result += """
+    lines.append("""
 **Available Tools:**
 - `get_contract_stats(agency, fiscal_year)` - Count contracts by agency/year
 - `get_agency_contracts(agency)` - Agency contract summary
 - `get_vendor_stats()` - Vendor certification breakdown
 - `get_solicitation_stats()` - Solicitation trends
 - `search_contracts/vendors/solicitations` - Search individual records
-- `get_spending_by_year(year)` - Checkbook NYC spending data
-"""
+- `get_spending_by_year(year)` - Checkbook NYC spending data""")
     
-    return result.strip()
+    return "\n".join(lines).strip()
 
 
 @mcp.tool()
+@memoize_tool(LRUCache(maxsize=TOOL_CACHE_SIZE))
 def get_vendor_stats() -> str:
     """
     Get statistics about NYC vendors including certification types and categories.
@@ -1006,61 +1441,29 @@ def get_vendor_stats() -> str:
     Returns:
         Vendor breakdown by certification type, ethnicity, and business category
     """
-    total = query_db("SELECT COUNT(*) as c FROM vendors", one=True)['c']
-    
-    # By certification type
-    cert_stats = query_db("""
-        SELECT certification_type, COUNT(*) as count
-        FROM vendors
-        WHERE certification_type IS NOT NULL AND certification_type != ''
-        GROUP BY certification_type
-        ORDER BY count DESC
-        LIMIT 10
-    """)
-    
-    # By ethnicity
-    ethnicity_stats = query_db("""
-        SELECT ethnicity, COUNT(*) as count
-        FROM vendors
-        WHERE ethnicity IS NOT NULL AND ethnicity != ''
-        GROUP BY ethnicity
-        ORDER BY count DESC
-        LIMIT 10
-    """)
-    
-    # By business category
-    category_stats = query_db("""
-        SELECT business_category, COUNT(*) as count
-        FROM vendors
-        WHERE business_category IS NOT NULL AND business_category != ''
-        GROUP BY business_category
-        ORDER BY count DESC
-        LIMIT 10
-    """)
+    total = stats_rows('vendor_total')[0]['c']
+    cert_stats = stats_rows('vendor_certifications')
+    ethnicity_stats = stats_rows('vendor_ethnicities')
+    category_stats = stats_rows('vendor_categories')
     
-    result = f"""**NYC Vendor Statistics**
+    lines = [f"""**NYC Vendor Statistics**
 
 **Total Registered Vendors: {total:,}**
 
-**By Certification Type:**
-"""
-    for c in cert_stats:
-        pct = (c['count'] / total) * 100
-        result += f"- {c['certification_type']}: {c['count']:,} ({pct:.1f}%)\n"
+**By Certification Type:**"""]
+    lines.extend(f"- {c['certification_type']}: {c['count']:,} ({c['pct']:.1f}%)" for c in cert_stats)
     
-    result += "\n**By Ethnicity:**\n"
-    for e in ethnicity_stats:
-        pct = (e['count'] / total) * 100
-        result += f"- {e['ethnicity']}: {e['count']:,} ({pct:.1f}%)\n"
+    lines.append("\n**By Ethnicity:**")
+    lines.extend(f"- {e['ethnicity']}: {e['count']:,} ({e['pct']:.1f}%)" for e in ethnicity_stats)
     
-    result += "\n**By Business Category:**\n"
-    for b in category_stats:
-        result += f"- {b['business_category']}: {b['count']:,}\n"
+    lines.append("\n**By Business Category:**")
+    lines.extend(f"- {b['business_category']}: {b['count']:,}" for b in category_stats)
     
-    return result.strip()
+    return "\n".join(lines).strip()
 
 
 @mcp.tool()
+@memoize_tool(LRUCache(maxsize=TOOL_CACHE_SIZE))
 def get_solicitation_stats(agency: Optional[str] = None) -> str:
     """
     Get solicitation statistics - counts by status, agency, and method.
@@ -1077,62 +1480,32 @@ def get_solicitation_stats(agency: Optional[str] = None) -> str:
         where = "WHERE agency LIKE ?"
         params = (f"%{agency}%",)
     
-    total = query_db(f"SELECT COUNT(*) as c FROM solicitations {where}", params, one=True)['c']
-    
-    if total == 0:
+    # Status groups cover every matching row, so they also carry the total
+    status_stats = stats_rows('solicitation_status', where, params)
+    if not status_stats:
         return f"No solicitations found{' for ' + agency if agency else ''}"
+    total = status_stats[0]['total']
     
-    # By status
-    status_stats = query_db(f"""
-        SELECT rfx_status, COUNT(*) as count
-        FROM solicitations
-        {where}
-        GROUP BY rfx_status
-        ORDER BY count DESC
-    """, params)
-    
-    # By procurement method
-    method_stats = query_db(f"""
-        SELECT procurement_method, COUNT(*) as count
-        FROM solicitations
-        {where}
-        GROUP BY procurement_method
-        ORDER BY count DESC
-        LIMIT 10
-    """, params)
-    
-    # Top agencies (if no agency filter)
-    agency_info = ""
-    if not agency:
-        top_agencies = query_db("""
-            SELECT agency, COUNT(*) as count
-            FROM solicitations
-            GROUP BY agency
-            ORDER BY count DESC
-            LIMIT 10
-        """)
-        agency_info = "\n**Top Agencies by Solicitation Count:**\n"
-        for a in top_agencies:
-            agency_info += f"- {a['agency'] or 'Unknown'}: {a['count']:,}\n"
+    method_stats = stats_rows('solicitation_methods', where, params)
     
     title = f"Solicitation Statistics{' - ' + agency if agency else ''}"
-    result = f"""**{title}**
+    lines = [f"""**{title}**
 
 **Total Solicitations: {total:,}**
 
-**By Status:**
-"""
-    for s in status_stats:
-        pct = (s['count'] / total) * 100
-        result += f"- {s['rfx_status'] or 'Unknown'}: {s['count']:,} ({pct:.1f}%)\n"
+**By Status:**"""]
+    lines.extend(f"- {s['rfx_status'] or 'Unknown'}: {s['count']:,} ({s['pct']:.1f}%)" for s in status_stats)
     
-    result += "\n**By Procurement Method:**\n"
-    for m in method_stats:
-        result += f"- {m['procurement_method'] or 'Unknown'}: {m['count']:,}\n"
+    lines.append("\n**By Procurement Method:**")
+    lines.extend(f"- {m['procurement_method'] or 'Unknown'}: {m['count']:,}" for m in method_stats)
     
-    result += agency_info
+    # Top agencies (if no agency filter)
+    if not agency:
+        top_agencies = stats_rows('solicitation_agencies')
+        lines.append("\n**Top Agencies by Solicitation Count:**")
+        lines.extend(f"- {a['agency'] or 'Unknown'}: {a['count']:,}" for a in top_agencies)
     
-    return result.strip()
+    return "\n".join(lines).strip()
 
 
 @mcp.tool()
@@ -1143,58 +1516,18 @@ def get_yearly_trends() -> str:
     Returns:
         Year-over-year counts and values for contracts
     """
-    # Extract year from contract IDs (format: CT1-846-20238xxxxx)
-    yearly_contracts = query_db("""
-        SELECT 
-            SUBSTR(contract_id, INSTR(contract_id, '-202') + 1, 4) as year,
-            COUNT(*) as count,
-            SUM(award_amount) as total_value
-        FROM contracts
-        WHERE contract_id LIKE '%202%'
-        GROUP BY year
-        ORDER BY year DESC
-        LIMIT 10
-    """)
-    
-    # Also try by start_date
-    yearly_by_date = query_db("""
-        SELECT 
-            SUBSTR(start_date, 1, 4) as year,
-            COUNT(*) as count,
-            SUM(award_amount) as total_value
-        FROM contracts
-        WHERE start_date IS NOT NULL
-        GROUP BY year
-        ORDER BY year DESC
-        LIMIT 10
-    """)
-    
-    # Solicitations by year
-    yearly_sols = query_db("""
-        SELECT 
-            SUBSTR(release_date, 1, 4) as year,
-            COUNT(*) as count
-        FROM solicitations
-        WHERE release_date IS NOT NULL
-        GROUP BY year
-        ORDER BY year DESC
-        LIMIT 10
-    """)
+    yearly_by_date = stats_rows('yearly_contracts')
+    yearly_sols = stats_rows('yearly_solicitations')
     
-    result = """**NYC Procurement Yearly Trends**
+    lines = ["""**NYC Procurement Yearly Trends**
 
-**Contracts by Start Year:**
-"""
-    for y in yearly_by_date:
-        if y['year'] and y['year'].isdigit():
-            result += f"- {y['year']}: {y['count']:,} contracts ({format_currency(y['total_value'])})\n"
+**Contracts by Start Year:**"""]
+    lines.extend(f"- {y['year']}: {y['count']:,} contracts ({format_currency(y['total_value'])})" for y in yearly_by_date)
     
-    result += "\n**Solicitations by Release Year:**\n"
-    for y in yearly_sols:
-        if y['year'] and y['year'].isdigit():
-            result += f"- {y['year']}: {y['count']:,} solicitations\n"
+    lines.append("\n**Solicitations by Release Year:**")
+    lines.extend(f"- {y['year']}: {y['count']:,} solicitations" for y in yearly_sols)
     
-    return result.strip()
+    return "\n".join(lines).strip()
 
 
 # ============================================================================
@@ -10,11 +10,13 @@ Implements OAuth 2.1 authorization code flow for Claude Online compatibility:
 - /mcp/mcp - Streamable HTTP MCP endpoint
 """
 import asyncio
+import secrets
 import uuid
 import time
 import urllib.parse
 from contextlib import asynccontextmanager
-from mcp_server import mcp
+from cachetools import TTLCache
+from mcp_server import mcp, init_db_pool
 from starlette.applications import Starlette
 from starlette.routing import Mount, Route
 from starlette.middleware import Middleware
@@ -26,13 +28,16 @@ from starlette.responses import JSONResponse, RedirectResponse
 if mcp.settings.transport_security:
     mcp.settings.transport_security.enable_dns_rebinding_protection = False
 
-# In-memory storage for authorization codes (simple implementation)
-AUTH_CODES = {}
+# In-memory storage for authorization codes (simple implementation).
+# Codes expire after 5 minutes and the store is capped, so abandoned
+# authorization requests are evicted instead of accumulating.
+AUTH_CODES = TTLCache(maxsize=10000, ttl=300)
 
 
 @asynccontextmanager
 async def lifespan(app):
     """Manage the lifecycle of the Streamable HTTP session manager."""
+    init_db_pool()
     async with mcp.session_manager.run():
         yield
 
@@ -102,7 +107,7 @@ async def oauth_authorize(request: Request) -> RedirectResponse:
     scope = request.query_params.get("scope", "")
     
     # Generate authorization code
-    auth_code = uuid.uuid4().hex
+    auth_code = secrets.token_urlsafe(16)
     
     # Store the code with its parameters (for token exchange)
     AUTH_CODES[auth_code] = {
@@ -111,7 +116,6 @@ async def oauth_authorize(request: Request) -> RedirectResponse:
         "code_challenge": code_challenge,
         "code_challenge_method": code_challenge_method,
         "scope": scope,
-        "created_at": time.time(),
     }
     
     # Build redirect URL with authorization code
@@ -148,24 +152,16 @@ async def oauth_token(request: Request) -> JSONResponse:
     redirect_uri = body.get("redirect_uri", "")
     code_verifier = body.get("code_verifier", "")
     
-    # Validate the authorization code
-    if code not in AUTH_CODES:
+    # Validate the authorization code (expired codes have already been evicted)
+    stored = AUTH_CODES.pop(code, None)  # Use code only once
+    if stored is None:
         return JSONResponse(
             status_code=400,
             content={"error": "invalid_grant", "error_description": "Invalid authorization code"}
         )
     
-    stored = AUTH_CODES.pop(code)  # Use code only once
-    
-    # Check if code is expired (5 minutes)
-    if time.time() - stored["created_at"] > 300:
-        return JSONResponse(
-            status_code=400,
-            content={"error": "invalid_grant", "error_description": "Authorization code expired"}
-        )
-    
     # Generate access token
-    access_token = f"oce-token-{uuid.uuid4().hex}"
+    access_token = f"oce-token-{secrets.token_urlsafe(24)}"
     
     return JSONResponse({
         "access_token": access_token,
@@ -5,18 +5,40 @@ Load contracts and solicitations locally and test CROL matching.
 
 import sqlite3
 import csv
-import re
 import os
 
+# Same CSV reading, row building and bulk-load settings as the database
+# build, so EPIN/PIN match keys and money/year columns agree and the PRAGMAs
+# stay in step
+from build_database import (
+    bulk_load_pragmas, contract_rows, solicitation_rows,
+    build_count_tables, build_stats_cache, create_indices, create_search_indexes,
+)
+
 DB_FILE = "databook.db"
 
 
-def normalize_epin(epin):
-    """Normalize EPIN for matching."""
-    if not epin:
-        return None
-    # Remove hyphens, spaces, and make uppercase
-    return re.sub(r'[^A-Z0-9]', '', epin.upper())
+def default_agency_id(f, rows, index):
+    """
+    Blank agency_id (row[index]) when the CSV has no wegov-org-id column.
+    
+    The build stores NULL for an absent column; these loaders have always
+    stored '' there (row.get("wegov-org-id", "")). f is rewound after
+    peeking at the header, before rows is first read.
+    """
+    header = next(csv.reader(f), [])
+    f.seek(0)
+    if "wegov-org-id" in header:
+        return rows
+    return (row[:index] + ('',) + row[index + 1:] for row in rows)
+
+
+def add_missing_columns(cursor, table, columns):
+    """Add any of `columns` ({name: type}) that a table created by an older version lacks."""
+    existing = {r[1] for r in cursor.execute(f"PRAGMA table_info({table})")}
+    for name, col_type in columns.items():
+        if name not in existing:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {name} {col_type}")
 
 
 def load_solicitations(conn):
@@ -44,40 +66,30 @@ def load_solicitations(conn):
         due_date TEXT,
         main_commodity TEXT,
         procurement_method TEXT,
-        normalized_epin TEXT
+        normalized_epin TEXT,
+        release_year INTEGER
     )
     """)
     
-    # Clear existing
+    # Databases from before the derived columns existed
+    add_missing_columns(cursor, "solicitations", {"normalized_epin": "TEXT", "release_year": "INTEGER"})
+    
+    # Clear existing. DELETE rather than DROP TABLE: this may be the server's
+    # databook.db, and dropping would also take the build's indexes with it
     cursor.execute("DELETE FROM solicitations")
     
+    # Rows are streamed from build_database's generator into executemany
     with open("solicitations_data.csv", 'r', encoding='utf-8-sig') as f:
-        reader = csv.DictReader(f)
-        to_db = []
-        for row in reader:
-            epin = row.get("EPIN")
-            to_db.append((
-                row.get("RFP-ID"),
-                row.get("BPM-ID"),
-                row.get("Program"),
-                row.get("Industry"),
-                epin,
-                row.get("Procurement Name"),
-                row.get("Agency"),
-                row.get("wegov-org-id", ""),
-                row.get("RFx Status"),
-                row.get("Release Date"),
-                row.get("Due Date"),
-                row.get("Main Commodity"),
-                row.get("Procurement Method"),
-                normalize_epin(epin)
-            ))
-        
         cursor.executemany("""
-        INSERT OR IGNORE INTO solicitations VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?)
-        """, to_db)
-        conn.commit()
-    print(f"Loaded {len(to_db)} solicitations.")
+        INSERT OR IGNORE INTO solicitations
+        (rfp_id, bpm_id, program, industry, epin, procurement_name, agency, agency_id, rfx_status, release_date, due_date, main_commodity, procurement_method, normalized_epin, release_year)
+        VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)
+        """, default_agency_id(f, solicitation_rows(f), 7))
+        loaded = cursor.rowcount
+    # The CROL joins probe this index; a standalone database won't have it yet
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_solicit_norm_epin ON solicitations(normalized_epin)")
+    conn.commit()
+    print(f"Loaded {loaded} solicitations.")
 
 
 def load_contracts(conn):
@@ -109,64 +121,73 @@ def load_contracts(conn):
         end_date TEXT,
         industry TEXT,
         normalized_contract_id TEXT,
-        normalized_epin TEXT
+        normalized_epin TEXT,
+        start_year INTEGER
     )
     """)
     
-    # Clear existing
-    cursor.execute("DELETE FROM contracts")
-    
-    def clean_money(val):
-        if not val: return 0.0
-        cleaned = re.sub(r'[^0-9.]', '', val)
-        if not cleaned: return 0.0
-        try:
-            return float(cleaned)
-        except ValueError:
-            return 0.0
+    # Databases from before the derived columns existed
+    add_missing_columns(cursor, "contracts", {
+        "normalized_contract_id": "TEXT", "normalized_epin": "TEXT", "start_year": "INTEGER",
+    })
     
-    def normalize_contract_id(cid):
-        if not cid: return None
-        return re.sub(r'[^A-Z0-9]', '', cid.upper())
+    # Clear existing. DELETE rather than DROP TABLE: this may be the server's
+    # databook.db, and dropping would also take the build's indexes with it
+    cursor.execute("DELETE FROM contracts")
     
+    # Rows are streamed from build_database's generator into executemany
     with open("contracts_data.csv", 'r', encoding='utf-8-sig') as f:
-        reader = csv.DictReader(f)
-        to_db = []
-        for row in reader:
-            cid = row.get("Contract ID")
-            epin = row.get("EPIN")
-            to_db.append((
-                row.get("CTR-ID"),
-                epin,
-                cid,
-                row.get("Contract Title"),
-                row.get("Agency"),
-                row.get("wegov-org-id", ""),
-                row.get("Vendor"),
-                row.get("Program"),
-                row.get("Procurement Method"),
-                row.get("Contract Type"),
-                row.get("Status"),
-                clean_money(row.get("Award Amount")),
-                clean_money(row.get("Current Contract Amount")),
-                row.get("Contract Start Date"),
-                row.get("Contract End Date"),
-                row.get("Industry"),
-                normalize_contract_id(cid),
-                normalize_epin(epin)
-            ))
-        
         cursor.executemany("""
-        INSERT OR IGNORE INTO contracts VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)
-        """, to_db)
-        conn.commit()
-    print(f"Loaded {len(to_db)} contracts.")
+        INSERT OR IGNORE INTO contracts
+        (ctr_id, epin, contract_id, contract_title, agency, agency_id, vendor_name, program, procurement_method, contract_type, status, award_amount, current_amount, start_date, end_date, industry, normalized_contract_id, normalized_epin, start_year)
+        VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)
+        """, default_agency_id(f, contract_rows(f), 5))
+        loaded = cursor.rowcount
+    # The CROL joins probe this index; a standalone database won't have it yet
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_contracts_norm_epin ON contracts(normalized_epin)")
+    conn.commit()
+    print(f"Loaded {loaded} contracts.")
+
+
+def refresh_derived_tables(conn):
+    """
+    Rebuild what build_database derives from contracts and solicitations.
+    
+    Reloading changes rowids and counts, so on the server's databook.db the
+    trigram search indexes, stats cache and count tables would otherwise no
+    longer match the rows. This is the expensive tail of build_database
+    (every index, both FTS tables and all cached aggregates), and it runs
+    after every load into a database built by build_database, recognized by
+    its stats_cache table. A standalone database of just these tables and
+    crol has none of them and is left alone.
+    """
+    if not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'stats_cache'").fetchone():
+        return
+    print("Refreshing indexes, search tables and cached stats...")
+    create_indices(conn)
+    create_search_indexes(conn)
+    build_stats_cache(conn)
+    build_count_tables(conn)
 
 
 def test_matching(conn):
     """Test CROL matching with solicitations and contracts."""
     cursor = conn.cursor()
     
+    # Databases built before crol.normalized_pin existed: add and index it
+    # so the normalized joins below can use an index
+    crol_columns = [r[1] for r in cursor.execute("PRAGMA table_info(crol)")]
+    if 'normalized_pin' not in crol_columns:
+        cursor.execute("ALTER TABLE crol ADD COLUMN normalized_pin TEXT")
+        cursor.execute("UPDATE crol SET normalized_pin = UPPER(REPLACE(PIN, '-', ''))")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_crol_normpin ON crol(normalized_pin)")
+    
+    # Fresh statistics for the joined tables so the planner picks which side
+    # of each CROL join to scan and which to probe by index
+    for table in ('solicitations', 'contracts', 'crol'):
+        cursor.execute(f"ANALYZE {table}")
+    conn.commit()
+    
     print("\n" + "="*60)
     print("CROL MATCHING ANALYSIS")
     print("="*60)
@@ -198,7 +219,7 @@ def test_matching(conn):
     cursor.execute("""
         SELECT COUNT(DISTINCT s.epin) 
         FROM solicitations s 
-        INNER JOIN crol c ON UPPER(REPLACE(c.PIN, '-', '')) = s.normalized_epin
+        INNER JOIN crol c ON c.normalized_pin = s.normalized_epin
     """)
     norm_solicit_match = cursor.fetchone()[0]
     
@@ -218,7 +239,7 @@ def test_matching(conn):
     cursor.execute("""
         SELECT COUNT(DISTINCT c.contract_id) 
         FROM contracts c 
-        INNER JOIN crol cr ON UPPER(REPLACE(cr.PIN, '-', '')) = c.normalized_epin
+        INNER JOIN crol cr ON cr.normalized_pin = c.normalized_epin
     """)
     norm_contract_match = cursor.fetchone()[0]
     
@@ -231,7 +252,7 @@ def test_matching(conn):
     cursor.execute("""
         SELECT s.epin, s.procurement_name, c.ShortTitle, c.TypeOfNoticeDescription
         FROM solicitations s 
-        INNER JOIN crol c ON UPPER(REPLACE(c.PIN, '-', '')) = s.normalized_epin
+        INNER JOIN crol c ON c.normalized_pin = s.normalized_epin
         LIMIT 5
     """)
     for row in cursor.fetchall():
@@ -252,21 +273,34 @@ def test_matching(conn):
     print(f"  {epins}")
     
     # Check for partial matches
+    # Trigram index over solicitation EPINs so each substring probe is an
+    # index lookup instead of a scan of every solicitation. It lives in the
+    # temp schema so nothing is left behind in databook.db (the DROP of the
+    # main-schema table clears one left by earlier runs).
     print(f"\nPartial Match Analysis:")
+    cursor.execute("DROP TABLE IF EXISTS main.sol_fts")
+    cursor.execute("DROP TABLE IF EXISTS temp.sol_fts")
+    cursor.execute("CREATE VIRTUAL TABLE temp.sol_fts USING fts5(normalized_epin, tokenize='trigram')")
+    cursor.execute("INSERT INTO temp.sol_fts SELECT normalized_epin FROM solicitations")
+    conn.commit()
     cursor.execute("""
-        SELECT COUNT(*) FROM crol 
+        SELECT COUNT(*) FROM crol
         WHERE EXISTS (
-            SELECT 1 FROM solicitations s 
-            WHERE s.normalized_epin LIKE '%' || SUBSTR(UPPER(REPLACE(PIN, '-', '')), 1, 8) || '%'
+            SELECT 1 FROM sol_fts
+            WHERE sol_fts.normalized_epin LIKE '%' || SUBSTR(crol.normalized_pin, 1, 8) || '%'
         )
     """)
     partial = cursor.fetchone()[0]
+    cursor.execute("DROP TABLE temp.sol_fts")
     print(f"  CROL PINs with partial solicitation match: {partial}")
 
 
 if __name__ == "__main__":
     conn = sqlite3.connect(DB_FILE)
-    load_solicitations(conn)
-    load_contracts(conn)
+    with bulk_load_pragmas(conn):
+        load_solicitations(conn)
+        load_contracts(conn)
+        refresh_derived_tables(conn)
     test_matching(conn)
+    conn.execute("PRAGMA optimize")
     conn.close()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Test that search_transactions still answers when spending chunks' schemas drift.
+
+Writes small parquet chunks to a temp directory laid out like the S3 bucket
+and points mcp_server at them, so no network access is needed. Runs under
+pytest, or directly as a script.
+"""
+
+import os
+import tempfile
+from pathlib import Path
+
+import duckdb
+
+import mcp_server
+
+# The FY2024 chunk every case shares
+CURRENT_CHUNK = """
+    SELECT '2024-03-01' AS issue_date, 'PARKS' AS agency, 'ACME CORP' AS payee_name,
+           'CT2' AS contract_id, 'SUPPLIES' AS expense_category, '5.00' AS check_amount
+"""
+
+# FY2023 chunks, read first, whose schema differs from FY2024's
+INT_PAYEE_CHUNK = """
+    SELECT '2023-03-01' AS issue_date, 'PARKS' AS agency, 12345 AS payee_name,
+           'CT1' AS contract_id, 'SUPPLIES' AS expense_category, '10.00' AS check_amount
+"""
+NO_PAYEE_CHUNK = """
+    SELECT '2023-03-01' AS issue_date, 'PARKS' AS agency,
+           'CT1' AS contract_id, 'SUPPLIES' AS expense_category, '10.00' AS check_amount
+"""
+
+
+def write_chunks(root, chunks):
+    """Write each {fiscal_year: select} chunk to root/fiscal_year=<year>/chunk_1.parquet"""
+    con = duckdb.connect()
+    for year, select in chunks.items():
+        partition = os.path.join(root, f"fiscal_year={year}")
+        os.makedirs(partition)
+        con.execute(f"COPY ({select}) TO '{partition}/chunk_1.parquet' (FORMAT PARQUET)")
+    con.close()
+
+
+def search_chunks(root, query):
+    """
+    Run search_transactions over the chunks under root, restoring mcp_server's state after.
+    
+    Returns the tool's output and whether it fell back to a union_by_name scan
+    (the only thing that looks the file glob up again after the view is made).
+    """
+    bucket, duck_con = mcp_server.S3_BUCKET, mcp_server._DUCK_CON
+    con = duckdb.connect()
+    try:
+        mcp_server.S3_BUCKET = str(root)
+        mcp_server.get_spending_files.cache_clear()
+        mcp_server.create_spending_view(con)
+        mcp_server._DUCK_CON = con
+        result = mcp_server.search_transactions(query)
+        return result, mcp_server.get_spending_files.cache_info().hits > 0
+    finally:
+        mcp_server.S3_BUCKET, mcp_server._DUCK_CON = bucket, duck_con
+        mcp_server.get_spending_files.cache_clear()
+        con.close()
+
+
+def test_search_with_retyped_column(tmp_path):
+    # payee_name is an integer in FY2023, so the ILIKE on v_spending fails to bind
+    write_chunks(tmp_path, {2023: INT_PAYEE_CHUNK, 2024: CURRENT_CHUNK})
+
+    result, fell_back = search_chunks(tmp_path, "PARKS")
+    assert fell_back
+    assert "Found 2 transaction(s)" in result, result
+    assert "$15.00" in result, result
+    assert "ACME CORP" in result and "12345" in result, result
+
+    result, _ = search_chunks(tmp_path, "ACME")
+    assert "Found 1 transaction(s)" in result, result
+
+
+def test_search_with_missing_column(tmp_path):
+    # FY2023 has no payee_name at all: a schema mismatch in the glob
+    write_chunks(tmp_path, {2023: NO_PAYEE_CHUNK, 2024: CURRENT_CHUNK})
+
+    result, fell_back = search_chunks(tmp_path, "PARKS")
+    assert fell_back
+    assert "Found 2 transaction(s)" in result, result
+    assert "$15.00" in result, result
+
+
+def test_unreadable_chunk_is_reported(tmp_path):
+    # A broken file isn't drift: report it rather than rescan with union_by_name
+    write_chunks(tmp_path, {2023: CURRENT_CHUNK})
+    (tmp_path / "fiscal_year=2024").mkdir()
+    (tmp_path / "fiscal_year=2024" / "chunk_1.parquet").write_bytes(b"PAR1")
+
+    result, fell_back = search_chunks(tmp_path, "PARKS")
+    assert not fell_back
+    assert result.startswith("Error querying spending data"), result
+    assert "too small to be a Parquet file" in result, result
+
+
+if __name__ == "__main__":
+    for test in (test_search_with_retyped_column, test_search_with_missing_column,
+                 test_unreadable_chunk_is_reported):
+        with tempfile.TemporaryDirectory() as root:
+            test(Path(root))
+        print(f"{test.__name__}: OK")